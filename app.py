@@ -2,6 +2,8 @@
 # Imports
 #----------------------------------------------------------------------------#
 from appFolder import app
+# importing these modules registers their routes and CLI commands
+from appFolder import controller, api, commands, monitoring
 import logging
 from logging import Formatter, FileHandler
 from appFolder.forms import *
@@ -1,7 +1,10 @@
+import os
 from flask import Flask
 from flask_moment import Moment
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
+from config import engine_options
+from appFolder.pool import InstrumentedQueuePool
+from appFolder import routing
 
 #----------------------------------------------------------------------------#
 # App Config.
@@ -9,7 +12,13 @@ from flask_sqlalchemy import SQLAlchemy
 
 app = Flask(__name__)
 moment = Moment(app)
-app.config.from_object('config')
-db = SQLAlchemy(app)
+app.config.from_object('config.' + os.environ.get('FYYUR_CONFIG', 'DevelopmentConfig'))
+if not app.config['SECRET_KEY']:
+    raise RuntimeError('SECRET_KEY is not set (see config.py)')
+app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+if 'pool_size' in app.config['SQLALCHEMY_ENGINE_OPTIONS']:
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].setdefault('poolclass', InstrumentedQueuePool)
+db = routing.RoutingSQLAlchemy(app)
+routing.init_app(app)
 
 migrate = Migrate(app, db)
@@ -0,0 +1,208 @@
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from flask import render_template, request, abort
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from config import engine_options
+from appFolder import app, cache, queries
+from appFolder.model import Venue, Artist, Show
+from appFolder.pagination import keyset_plan
+from appFolder.viewmodels import ShowSummary, ArtistSummary
+
+#----------------------------------------------------------------------------#
+# Async serving mode.
+#----------------------------------------------------------------------------#
+
+# An ASGI application (see asgi.py) for running under uvicorn. The
+# read-heavy pages below are async views on an async engine (asyncpg, or
+# aiosqlite for an SQLite stand-in), so a worker's event loop keeps
+# serving other requests while their queries are in flight, and the
+# detail pages run their three independent queries (the entity, its past
+# shows, its upcoming shows) concurrently on separate connections. The
+# app itself is served through asgiref's WSGI adapter on a thread pool.
+# The sync mode (app.py, any WSGI server) is unchanged.
+#
+# The async views are ordinary Flask async views that replace the sync
+# ones for the same endpoints (see AsgiApp). They reuse the statements
+# the query layer builds, and page caching, the before/after_request
+# hooks and error handlers apply to them as usual. They always read from
+# the primary; replica routing is sync-only.
+
+DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+# one engine per event loop (i.e. per uvicorn worker)
+_engines = weakref.WeakKeyDictionary()
+
+
+def database_url(config):
+    if config.get('ASYNC_DATABASE_URI'):
+        return config['ASYNC_DATABASE_URI']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    return url.set(drivername=DRIVERS[url.get_backend_name()])
+
+
+def async_engine_options(config):
+    # the sync pool settings; asyncpg takes the statement timeout as a
+    # server setting rather than libpq options
+    options = engine_options(config)
+    if options.pop('connect_args', None):
+        options['connect_args'] = {"server_settings": {
+            "statement_timeout": str(config['DB_STATEMENT_TIMEOUT_MS'])}}
+    return options
+
+
+def engine():
+    loop = asyncio.get_running_loop()
+    if loop not in _engines:
+        _engines[loop] = create_async_engine(database_url(app.config),
+                                             **async_engine_options(app.config))
+    return _engines[loop]
+
+
+async def fetch_all(query):
+    # rows of a Query or select, on a connection of its own
+    statement = getattr(query, 'statement', query)
+    async with engine().connect() as conn:
+        return (await conn.execute(statement)).all()
+
+
+#  Views
+#  ----------------------------------------------------------------
+
+async def _listing(query, order):
+    query, finish = keyset_plan(query, order, after=request.args.get('after'),
+                                before=request.args.get('before'))
+    return finish(await fetch_all(query))
+
+
+async def _detail(model, entity_id):
+    # the detail page's view model, or None for an unknown id
+    now = datetime.now()
+    timeline = queries.timeline_query(model, entity_id)
+    entity, past, upcoming = await asyncio.gather(
+        fetch_all(queries.detail_query(model, entity_id)),
+        fetch_all(timeline.filter(Show.start_time <= now)),
+        fetch_all(timeline.filter(Show.start_time > now)))
+    if not entity:
+        return None
+    if upcoming:
+        # the page changes when the next show starts
+        cache.limit_ttl((upcoming[0].start_time - now).total_seconds())
+    return queries.build_detail(model, entity[0], queries.timeline(model, past, upcoming))
+
+
+@cache.conditional(queries.venues_version)
+@cache.cached_page('venues')
+async def venues():
+    page = await _listing(queries.venue_rows(), queries.VENUE_ORDER)
+    page["items"] = queries.group_areas(page["items"])
+    return render_template('pages/venues.html', areas=page["items"], page=page)
+
+
+@cache.conditional(queries.venue_version)
+@cache.cached_page('venue:{venue_id}')
+async def show_venue(venue_id):
+    data = await _detail(Venue, venue_id)
+    if data is None:
+        abort(404)
+    return render_template('pages/show_venue.html', venue=data)
+
+
+@cache.conditional(queries.artists_version)
+@cache.cached_page('artists')
+async def artists():
+    page = await _listing(queries.artist_rows(), queries.ARTIST_ORDER)
+    return render_template('pages/artists.html',
+                           artists=queries.summaries(page["items"], ArtistSummary), page=page)
+
+
+@cache.conditional(queries.artist_version)
+@cache.cached_page('artist:{artist_id}')
+async def show_artist(artist_id):
+    data = await _detail(Artist, artist_id)
+    if data is None:
+        abort(404)
+    return render_template('pages/show_artist.html', artist=data)
+
+
+@cache.conditional(queries.shows_version)
+@cache.cached_page('shows')
+async def shows():
+    page = await _listing(queries.show_rows(), queries.SHOW_ORDER)
+    return render_template('pages/shows.html',
+                           shows=queries.summaries(page["items"], ShowSummary), page=page)
+
+
+# endpoint -> async view served in place of the sync one under ASGI
+VIEWS = {
+    'venues': venues,
+    'show_venue': show_venue,
+    'artists': artists,
+    'show_artist': show_artist,
+    'shows': shows
+}
+
+
+#  ASGI
+#  ----------------------------------------------------------------
+
+def _closing(wsgi_app):
+    # wsgi_app with its response closed once the body has been sent
+    # (asgiref's adapter only iterates it)
+    def app(environ, start_response):
+        body = wsgi_app(environ, start_response)
+        try:
+            yield from body
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+    return app
+
+
+class _Request(WsgiToAsgiInstance):
+    # asgiref's adapter for one request, run on the given thread pool.
+    # Its default runs every request's WSGI call on one shared thread.
+    # The whole call, including the iteration over a streamed body, stays
+    # on one pool thread, since the body may still be using the
+    # request's database connection.
+    _run_wsgi_app = WsgiToAsgiInstance.run_wsgi_app.__wrapped__
+
+    def __init__(self, wsgi_app, executor):
+        super().__init__(wsgi_app)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self._run_wsgi_app, thread_sensitive=False,
+                            executor=self.executor)(body)
+
+
+class AsgiApp:
+    # The Flask app as an ASGI application, with the views above in place
+    # of the sync ones. Flask runs async views through asgiref, which
+    # from these threads schedules them on the server's event loop, so
+    # they share that loop's engine.
+    def __init__(self, flask_app, views=VIEWS, threads=32):
+        flask_app.view_functions.update(views)
+        self.wsgi_app = _closing(flask_app)
+        self.executor = ThreadPoolExecutor(threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        await _Request(self.wsgi_app, self.executor)(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                engine_ = _engines.pop(asyncio.get_running_loop(), None)
+                if engine_ is not None:
+                    await engine_.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
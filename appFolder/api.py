@@ -0,0 +1,160 @@
+import hashlib
+from dataclasses import asdict
+from flask import request, abort, jsonify, make_response, Response, stream_with_context
+from appFolder import app, queries, routing
+from appFolder.model import Venue, Artist
+from appFolder.serialize import dumps
+
+#----------------------------------------------------------------------------#
+# JSON API (v1).
+#----------------------------------------------------------------------------#
+
+# Same query layer as the HTML views. Listings take the keyset cursors
+# (?after= / ?before= / ?limit=), every endpoint takes ?fields=a,b for a
+# sparse response, and JSON bodies carry an ETag so unchanged responses
+# come back as 304. The *.ndjson exports stream the whole table one row
+# per line without materializing it. Every endpoint is a read, so all of
+# them may use a replica.
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def _error(status, message):
+    abort(make_response(jsonify({"error": message}), status))
+
+
+def _fields(allowed):
+    # requested ?fields=, validated against what the resource has
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        _error(400, f"unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _select(item, fields):
+    return item if fields is None else {f: item[f] for f in fields}
+
+
+def _columns(query):
+    return [column['name'] for column in query.column_descriptions]
+
+
+def _json(payload):
+    body = dumps(payload)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.sha1(body.encode()).hexdigest())
+    return response.make_conditional(request)
+
+
+def _listing(page, query):
+    fields = _fields(_columns(query))
+    return _json({
+        "data": [_select(row._asdict(), fields) for row in page["items"]],
+        "prev_cursor": page["prev_cursor"],
+        "next_cursor": page["next_cursor"]
+    })
+
+
+def _export(query, order):
+    fields = _fields(_columns(query))
+    rows = query.order_by(*order).yield_per(EXPORT_BATCH_SIZE)
+
+    def generate():
+        for row in rows:
+            yield dumps(_select(row._asdict(), fields)) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@app.route('/api/v1/venues')
+@routing.read_only
+def api_venues():
+    page = queries.venue_listing(after=request.args.get('after'),
+                                 before=request.args.get('before'))
+    return _listing(page, queries.venue_rows())
+
+
+@app.route('/api/v1/venues/<int:venue_id>')
+@routing.read_only
+def api_venue(venue_id):
+    detail = queries.venue_detail(venue_id)
+    if detail is None:
+        _error(404, f'venue {venue_id} not found')
+    data = asdict(detail)
+    return _json({"data": _select(data, _fields(data))})
+
+
+@app.route('/api/v1/venues/search')
+@routing.read_only
+def api_search_venues():
+    results = queries.search_results(Venue, request.args.get('q', ''),
+                                     request.args.get('page', 1, type=int))
+    fields = _fields(['id', 'name', 'num_upcoming_shows'])
+    results["data"] = [_select(item, fields) for item in results["data"]]
+    return _json(results)
+
+
+@app.route('/api/v1/venues.ndjson')
+@routing.read_only
+def api_export_venues():
+    return _export(queries.venue_rows(), queries.VENUE_ORDER)
+
+
+#  Artists
+#  ----------------------------------------------------------------
+
+@app.route('/api/v1/artists')
+@routing.read_only
+def api_artists():
+    page = queries.artist_listing(after=request.args.get('after'),
+                                  before=request.args.get('before'))
+    return _listing(page, queries.artist_rows())
+
+
+@app.route('/api/v1/artists/<int:artist_id>')
+@routing.read_only
+def api_artist(artist_id):
+    detail = queries.artist_detail(artist_id)
+    if detail is None:
+        _error(404, f'artist {artist_id} not found')
+    data = asdict(detail)
+    return _json({"data": _select(data, _fields(data))})
+
+
+@app.route('/api/v1/artists/search')
+@routing.read_only
+def api_search_artists():
+    results = queries.search_results(Artist, request.args.get('q', ''),
+                                     request.args.get('page', 1, type=int))
+    fields = _fields(['id', 'name', 'num_upcoming_shows'])
+    results["data"] = [_select(item, fields) for item in results["data"]]
+    return _json(results)
+
+
+@app.route('/api/v1/artists.ndjson')
+@routing.read_only
+def api_export_artists():
+    return _export(queries.artist_rows(), queries.ARTIST_ORDER)
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@app.route('/api/v1/shows')
+@routing.read_only
+def api_shows():
+    page = queries.show_listing(after=request.args.get('after'),
+                                before=request.args.get('before'))
+    return _listing(page, queries.show_rows())
+
+
+@app.route('/api/v1/shows.ndjson')
+@routing.read_only
+def api_export_shows():
+    return _export(queries.show_rows(), queries.SHOW_ORDER)
@@ -0,0 +1,237 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from flask import request, send_from_directory, url_for
+from appFolder import app
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+#----------------------------------------------------------------------------#
+# Static assets.
+#----------------------------------------------------------------------------#
+
+# url_for('static', filename='css/main.css') links to
+# /static/css/main.<hash>.css, where hash is taken from the file's
+# contents. The static view maps such a name back to the file and serves
+# it with a far-future, immutable Cache-Control, so browsers never ask
+# for it again. A changed file gets a new name on the next render. Plain
+# /static/... URLs still work, with Flask's usual revalidation.
+#
+# `flask build-assets` concatenates and minifies the stylesheets and
+# scripts of layouts/main.html into one file per BUNDLES entry under
+# static/build/, named with their own hash, next to .gz and .br copies.
+# The layout links the bundles when ASSET_BUNDLES is on and a build
+# exists, and the source files otherwise. Any static file with such
+# copies is sent precompressed to clients that accept the encoding.
+# A build keeps the bundles of the build before it, which pages rendered
+# before the deploy (in browsers, or still running workers) link, and
+# removes anything older.
+
+BUILD_DIR = 'build'
+
+# bundle -> its source files, in load order
+BUNDLES = {
+    'main.css': ['css/bootstrap.min.css', 'css/layout.main.css', 'css/main.css',
+                 'css/main.responsive.css', 'css/main.quickfix.css'],
+    # loaded in <head>, before the page renders
+    'head.js': ['js/libs/modernizr-2.8.2.min.js', 'js/libs/moment.min.js'],
+    # deferred; jQuery itself comes from the CDN (with a local fallback)
+    'main.js': ['js/script.js', 'js/libs/bootstrap-3.1.1.min.js', 'js/plugins.js'],
+}
+
+# encodings in order of preference -> suffix of the precompressed copy
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+FINGERPRINT = re.compile(r'\.([0-9a-f]{12})(\.[^./]+)$')
+
+# filename -> (mtime, fingerprinted filename)
+_fingerprints = {}
+
+
+def fingerprinted(filename):
+    # filename with its content hash, or unchanged when there is no such
+    # file
+    path = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return filename
+    cached = _fingerprints.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.md5(f.read()).hexdigest()[:12]
+    name, ext = os.path.splitext(filename)
+    _fingerprints[filename] = (mtime, f'{name}.{digest}{ext}')
+    return _fingerprints[filename][1]
+
+
+@app.url_defaults
+def fingerprint_static(endpoint, values):
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    # built bundles already carry their hash
+    if not values['filename'].startswith(BUILD_DIR + '/'):
+        values['filename'] = fingerprinted(values['filename'])
+
+
+def _send(filename, max_age=None):
+    # the file, or its precompressed copy in the best encoding the client
+    # accepts
+    path = os.path.join(app.static_folder, filename)
+    variants = [(encoding, suffix) for encoding, suffix in ENCODINGS
+                if os.path.isfile(path + suffix)]
+    for encoding, suffix in variants:
+        if request.accept_encodings[encoding]:
+            response = send_from_directory(app.static_folder, filename + suffix, max_age=max_age,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(app.static_folder, filename, max_age=max_age)
+    if variants:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def static(filename):
+    if filename.startswith(BUILD_DIR + '/'):
+        original = filename
+    else:
+        match = FINGERPRINT.search(filename)
+        original = match and filename[:match.start()] + match.group(2)
+        if not original or fingerprinted(original) != filename:
+            # a plain name, or a hash from another deploy
+            return _send(original or filename)
+    response = _send(original, max_age=app.config['STATIC_MAX_AGE'])
+    response.headers['Cache-Control'] = f"public, max-age={app.config['STATIC_MAX_AGE']}, immutable"
+    return response
+
+
+app.view_functions['static'] = static
+
+
+#  Bundles
+#  ----------------------------------------------------------------
+
+def minify_css(css):
+    css = re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    # rjsmin when it is installed; otherwise the (mostly pre-minified)
+    # sources are only concatenated. Source map comments would point at
+    # the wrong file.
+    js = re.sub(r'^//[#@] sourceMappingURL=.*$', '', js, flags=re.M)
+    return rjsmin.jsmin(js) if rjsmin else js
+
+
+def _read(filename):
+    with open(os.path.join(app.static_folder, filename), encoding='utf-8') as f:
+        return f.read()
+
+
+def _load_manifest(path):
+    # {bundle: filename} of a build, {} when there is none
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _generation(manifest):
+    # the file names in static/build of one build's bundles
+    names = set()
+    for filename in manifest.values():
+        name = os.path.basename(filename)
+        names.update([name] + [name + suffix for _, suffix in ENCODINGS])
+    return names
+
+
+def build():
+    # write a fresh set of bundles and their manifest to static/build;
+    # returns {bundle: {"sources", "source_bytes", "path", "bytes", "gzip", "br"}}
+    build_dir = os.path.join(app.static_folder, BUILD_DIR)
+    os.makedirs(build_dir, exist_ok=True)
+    manifest_path = os.path.join(build_dir, 'manifest.json')
+    previous = _load_manifest(manifest_path)
+
+    manifest, report = {}, {}
+    for bundle, sources in BUNDLES.items():
+        if bundle.endswith('.css'):
+            content = '\n'.join(minify_css(_read(source)) for source in sources)
+        else:
+            content = '\n;\n'.join(minify_js(_read(source)) for source in sources)
+        data = content.encode('utf-8')
+        name, ext = os.path.splitext(bundle)
+        filename = f'{BUILD_DIR}/{name}.{hashlib.md5(data).hexdigest()[:12]}{ext}'
+        path = os.path.join(app.static_folder, filename)
+        compressed = {"gzip": gzip.compress(data, 9, mtime=0)}
+        if brotli:
+            compressed["br"] = brotli.compress(data, quality=11)
+        with open(path, 'wb') as f:
+            f.write(data)
+        for encoding, suffix in ENCODINGS:
+            if encoding in compressed:
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed[encoding])
+        manifest[bundle] = filename
+        report[bundle] = {
+            "sources": len(sources),
+            "source_bytes": sum(os.path.getsize(os.path.join(app.static_folder, source))
+                                for source in sources),
+            "path": filename,
+            "bytes": len(data),
+            **{encoding: len(body) for encoding, body in compressed.items()}
+        }
+
+    # workers pick the new manifest up as soon as it is in place
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    keep = _generation(manifest) | _generation(previous) | {'manifest.json'}
+    for name in os.listdir(build_dir):
+        if name not in keep:
+            os.remove(os.path.join(build_dir, name))
+    return report
+
+
+# (manifest mtime, manifest)
+_manifest = [None, {}]
+
+
+def _bundles():
+    path = os.path.join(app.static_folder, BUILD_DIR, 'manifest.json')
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    if _manifest[0] != mtime:
+        _manifest[:] = [mtime, _load_manifest(path)]
+    return _manifest[1]
+
+
+@app.template_global()
+def asset_urls(bundle):
+    # the URL of the built bundle, or of its sources when there is none
+    built = app.config['ASSET_BUNDLES'] and _bundles().get(bundle)
+    if built:
+        return [url_for('static', filename=built)]
+    return [url_for('static', filename=source) for source in BUNDLES[bundle]]
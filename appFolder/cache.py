@@ -0,0 +1,346 @@
+import hashlib
+import inspect
+import itertools
+import math
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache, wraps
+from flask import request, session, g, has_request_context, make_response
+from werkzeug.http import is_resource_modified
+from appFolder import app, routing
+
+#----------------------------------------------------------------------------#
+# Response cache.
+#----------------------------------------------------------------------------#
+
+# Rendered GET pages are cached under their path + query string. Every
+# entry also carries tags ("venues", "venue:3", ...) and the key includes
+# the current version of each tag, so invalidate("venue:3") just bumps that
+# version and every page built from venue 3 misses from then on; the stale
+# entries expire out of the backend on their own (an LRU and TTLs in
+# memory, TTLs in redis, a sweep of expired files on disk). Writes call
+# invalidate() with exactly the tags they affect, after their commit.
+#
+# A value built within READ_YOUR_WRITES_SECONDS of an invalidation of one
+# of its tags reads the primary: a replica that has not replayed the
+# write yet would otherwise fill the new version with the old data, for
+# every user, until the entry expires.
+
+
+class MemoryBackend:
+    # in-process LRU with a per-entry TTL
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class FileBackend:
+    # one pickle per key in a local directory, shared by all workers on
+    # the host. Files are spread over 256 subdirectories by key hash, and
+    # a file's mtime is its expiry time. get() removes an expired file it
+    # comes across; for the keys nobody asks for again (pages under an
+    # old tag version), every SWEEP_EVERY-th set() sweeps the expired
+    # files out of the next subdirectory in turn.
+
+    SWEEP_EVERY = 64
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.sets = itertools.count(1)
+        self.buckets = itertools.cycle(f'{i:02x}' for i in range(256))
+        self.lock = threading.Lock()
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires < time.time():
+            _remove(path)
+            return None
+        return value
+
+    def set(self, key, value, ttl):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        expires = time.time() + ttl
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((expires, value), f)
+        os.utime(tmp, (expires, expires))
+        os.replace(tmp, path)
+        if next(self.sets) % self.SWEEP_EVERY == 0:
+            with self.lock:
+                bucket = next(self.buckets)
+            self.sweep(bucket)
+
+    def sweep(self, bucket):
+        # remove the expired files of one subdirectory; returns how many
+        now = time.time()
+        removed = 0
+        try:
+            entries = list(os.scandir(os.path.join(self.directory, bucket)))
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                expired = entry.stat().st_mtime < now
+            except OSError:
+                continue
+            if expired and not entry.name.endswith('.tmp'):
+                removed += _remove(entry.path)
+        return removed
+
+    def clear(self):
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                _remove(os.path.join(root, name))
+
+
+def _remove(path):
+    # another worker may have removed (or replaced) it first
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
+
+
+class RedisBackend:
+    # anything speaking the redis-py get/set(ex=)/flushdb interface
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return None if value is None else pickle.loads(value)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def clear(self):
+        self.client.flushdb()
+
+
+def make_backend(config):
+    kind = config['RESPONSE_CACHE_BACKEND']
+    if kind == 'file':
+        return FileBackend(config['RESPONSE_CACHE_DIR'])
+    if kind == 'redis':
+        import redis
+        return RedisBackend(redis.Redis.from_url(config['RESPONSE_CACHE_REDIS_URL']))
+    return MemoryBackend(config['RESPONSE_CACHE_MAX_ENTRIES'])
+
+
+backend = make_backend(app.config)
+
+# tag versions never expire on their own, only get replaced
+TAG_TTL = 30 * 24 * 3600
+
+
+def _tag_version(tag):
+    version = backend.get('tag:' + tag)
+    if version is None:
+        version = time.time_ns()
+        backend.set('tag:' + tag, version, TAG_TTL)
+    return version
+
+
+def invalidate(*tags):
+    for tag in tags:
+        backend.set('tag:' + tag, time.time_ns(), TAG_TTL)
+
+
+def _versioned(key, tags):
+    # (key + tag versions, whether a tag was invalidated just now)
+    versions = [_tag_version(tag) for tag in tags]
+    window = app.config['READ_YOUR_WRITES_SECONDS'] * 10**9
+    fresh = time.time_ns() - max(versions, default=0) < window
+    return f'{key}|' + ','.join(f'{tag}@{version}' for tag, version in zip(tags, versions)), fresh
+
+
+def limit_ttl(seconds):
+    # cap the lifetime of the page being rendered, for pages built from
+    # data that goes stale at a known time
+    if has_request_context():
+        g.page_ttl = min(g.get('page_ttl', math.inf), seconds)
+
+
+def memoize(key, tags, build):
+    # cache build()'s value under key + tag versions. build returns
+    # (value, ttl); the page that uses the value is capped to the same
+    # remaining lifetime.
+    key, fresh = _versioned(key, tags)
+    entry = backend.get(key)
+    if entry is None:
+        if fresh:
+            routing.use_primary()
+        value, ttl = build()
+        entry = (time.time() + ttl, value)
+        if ttl > 0:
+            backend.set(key, entry, ttl)
+    limit_ttl(entry[0] - time.time())
+    return entry[1]
+
+
+def _page_key(tags, kwargs):
+    # None when the page must not be cached: pages with pending flash
+    # messages are rendered fresh and not stored, the messages are per user.
+    # The deploy digest keeps a new deploy from serving pages that link the
+    # previous deploy's markup and assets.
+    if not app.config['RESPONSE_CACHE_ENABLED'] or session.get('_flashes'):
+        return None
+    key, fresh = _versioned(f'page:{_deploy_digest()}:{request.full_path}',
+                            [tag.format(**kwargs) for tag in tags])
+    if fresh:
+        routing.use_primary()
+    return key
+
+
+def _store_page(key, body, ttl):
+    lifetime = min(ttl or app.config['RESPONSE_CACHE_TTL'],
+                   g.pop('page_ttl', math.inf))
+    if isinstance(body, str) and lifetime > 0:
+        backend.set(key, body, lifetime)
+
+
+def cached_page(*tags, ttl=None):
+    # cache a GET view's rendered body. tags may use the view's arguments,
+    # e.g. @cached_page('venue:{venue_id}'). Works on async views too.
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(**kwargs):
+                key = _page_key(tags, kwargs)
+                body = key and backend.get(key)
+                if body is None:
+                    body = await view(**kwargs)
+                    if key:
+                        _store_page(key, body, ttl)
+                return body
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(**kwargs):
+            key = _page_key(tags, kwargs)
+            body = key and backend.get(key)
+            if body is None:
+                body = view(**kwargs)
+                if key:
+                    _store_page(key, body, ttl)
+            return body
+        return wrapper
+    return decorator
+
+
+#----------------------------------------------------------------------------#
+# Conditional GET.
+#----------------------------------------------------------------------------#
+
+# Data pages carry an ETag and Last-Modified computed from the rows they
+# show, and a request whose If-None-Match / If-Modified-Since still
+# matches is answered 304 before the view (or the page cache) runs. Each
+# page's version query returns the ids, updated_at timestamps and counts
+# of those rows. That is a cheap index scan, and the ETag is a hash of
+# its result together with the contents of the templates and static
+# files, so a deploy that changes the markup or the assets it links to
+# changes every ETag. Last-Modified is the latest timestamp in it.
+
+
+@lru_cache(maxsize=None)
+def _deploy_digest():
+    digest = hashlib.sha1()
+    for folder in (os.path.join(app.root_path, app.template_folder), app.static_folder):
+        for root, dirs, files in sorted(os.walk(folder)):
+            for name in sorted(files):
+                with open(os.path.join(root, name), 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _validators(rows):
+    # (etag, last modified) of a page's version rows; None for no rows (an
+    # unknown id) or when the page carries flash messages
+    if not rows or session.get('_flashes'):
+        return None
+    stamps = [value for row in rows for value in row if isinstance(value, datetime)]
+    etag = hashlib.sha1((_deploy_digest() + repr([tuple(row) for row in rows])).encode())
+    return etag.hexdigest(), max(stamps, default=None)
+
+
+def _not_modified(validators):
+    etag, last_modified = validators
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _with_validators(make_response('', 304), validators)
+
+
+def _with_validators(response, validators):
+    if validators and response.status_code in (200, 304):
+        response.set_etag(validators[0])
+        response.last_modified = validators[1]
+        response.headers['Cache-Control'] = app.config['PAGE_CACHE_CONTROL']
+    return response
+
+
+def conditional(version):
+    # version(**view kwargs) returns the page's version query; the view
+    # only runs when the client's copy is stale. Works on async views too.
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(**kwargs):
+                from appFolder.aio import fetch_all
+                validators = _validators(await fetch_all(version(**kwargs)))
+                response = validators and _not_modified(validators)
+                if response is None:
+                    response = _with_validators(make_response(await view(**kwargs)), validators)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(**kwargs):
+            validators = _validators(version(**kwargs).all())
+            response = validators and _not_modified(validators)
+            if response is None:
+                response = _with_validators(make_response(view(**kwargs)), validators)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+import click
+from appFolder import app, importer, exporter, stats, templating, assets
+
+#----------------------------------------------------------------------------#
+# CLI commands.
+#----------------------------------------------------------------------------#
+
+
+@app.cli.command('import')
+@click.argument('table', type=click.Choice(sorted(importer.TABLES)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='Input format; guessed from the file name by default.')
+@click.option('--chunk-size', default=1000, show_default=True,
+              help='Rows validated and inserted per transaction.')
+@click.option('--errors', 'errors_path', type=click.Path(dir_okay=False),
+              help='Write rejected rows here (NDJSON) instead of stderr.')
+def import_command(table, path, fmt, chunk_size, errors_path):
+    """Bulk load venues, artists or shows from CSV/NDJSON.
+
+    Rerunning after a failure resumes after the last committed chunk.
+    """
+    out = open(errors_path, 'a') if errors_path else None
+
+    def on_error(line, errors):
+        message = json.dumps({"line": line, "errors": errors})
+        if out:
+            out.write(message + '\n')
+        else:
+            click.echo(message, err=True)
+
+    try:
+        counts = importer.import_file(table, path, fmt=fmt,
+                                      chunk_size=chunk_size, on_error=on_error)
+    finally:
+        if out:
+            out.close()
+    click.echo(f"{table}: {counts['inserted']} inserted, "
+               f"{counts['skipped']} already present, {counts['failed']} rejected")
+
+
+@app.cli.command('export')
+@click.argument('tables', nargs=-1, type=click.Choice(sorted(exporter.MODELS)))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']),
+              default='ndjson', show_default=True)
+@click.option('--output-dir', default='export', show_default=True,
+              type=click.Path(file_okay=False))
+@click.option('--since', help="ISO timestamp (UTC) or 'last' for rows changed "
+                              "since the previous export into --output-dir.")
+@click.option('--batch-size', default=1000, show_default=True,
+              help='Rows fetched per round trip from the server-side cursor.')
+def export_command(tables, fmt, output_dir, since, batch_size):
+    """Stream venues, artists and shows to gzipped NDJSON or CSV."""
+    if since and since != 'last':
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            raise click.BadParameter(since, param_hint='--since')
+    written = exporter.export_tables(tables or sorted(exporter.MODELS), output_dir,
+                                     fmt=fmt, since=since, batch_size=batch_size)
+    for table, count in written.items():
+        click.echo(f'{table}: {count} rows')
+
+
+@app.cli.command('refresh-stats')
+@click.option('--full', is_flag=True, help='Recompute every row instead of '
+                                           'only those with a show that has started.')
+def refresh_stats_command(full):
+    """Roll the venue/artist show statistics forward.
+
+    Run it every minute or so from cron; shows that have started move
+    from the upcoming to the past counts.
+    """
+    if full:
+        stats.rebuild()
+        click.echo('show statistics rebuilt')
+    else:
+        click.echo(f'{stats.roll_forward()} rows rolled forward')
+
+
+@app.cli.command('compile-templates')
+def compile_templates_command():
+    """Fill the Jinja bytecode cache so fresh workers skip compiling."""
+    click.echo(f'{templating.compile_templates()} templates compiled')
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Bundle, minify and precompress the layout's CSS and JS."""
+    for bundle, built in assets.build().items():
+        sizes = ', '.join(f'{built[encoding]} {encoding}' for encoding in ('gzip', 'br')
+                          if encoding in built)
+        click.echo(f"{built['path']}: {built['sources']} files, {built['source_bytes']} "
+                   f"-> {built['bytes']} bytes ({sizes})")
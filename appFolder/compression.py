@@ -0,0 +1,51 @@
+import gzip
+from flask import request
+from appFolder import app
+from appFolder.assets import brotli
+
+#----------------------------------------------------------------------------#
+# Response compression.
+#----------------------------------------------------------------------------#
+
+# Rendered pages and API responses of at least COMPRESS_MIN_SIZE bytes are
+# compressed on the way out, with brotli when the client accepts it (and
+# the module is installed), gzip otherwise. Dynamic responses use fast
+# levels; the static bundles are compressed once, at maximum level, by
+# `flask build-assets` (see assets.py) and are never compressed here.
+# A compressed response's ETag is made weak, since its bytes differ from
+# the identity encoding.
+
+COMPRESSORS = {
+    'br': lambda body: brotli.compress(body, quality=app.config['COMPRESS_BR_QUALITY']),
+    'gzip': lambda body: gzip.compress(body, app.config['COMPRESS_GZIP_LEVEL'])
+}
+
+
+def _encoding():
+    for encoding in ('br', 'gzip'):
+        if request.accept_encodings[encoding] and (encoding != 'br' or brotli):
+            return encoding
+    return None
+
+
+@app.after_request
+def compress_response(response):
+    if (not app.config['COMPRESS_ENABLED'] or response.direct_passthrough
+            or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']):
+        return response
+    body = response.get_data()
+    if len(body) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _encoding()
+    if encoding is None:
+        return response
+    response.set_data(COMPRESSORS[encoding](body))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,62 @@
+import json
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from sqlalchemy.dialects.sqlite.base import SQLiteDialect
+from sqlalchemy.dialects.sqlite.pysqlite import SQLiteDialect_pysqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.types import ARRAY
+
+#----------------------------------------------------------------------------#
+# SQLite stand-in.
+#----------------------------------------------------------------------------#
+
+# The models target Postgres. The benchmarks, the tests and local runs
+# without a server use SQLite instead (see benchmarks/datagen.py), which
+# has no arrays and no exclusion constraints. Importing this module (the
+# models do) lets create_all() build the same tables there:
+#
+#   - ARRAY columns are JSON text, written and read back as lists, with
+#     each item going through the item type (so genres still load as
+#     Genre members);
+#   - the exclusion constraints on Show are left out of CREATE TABLE;
+#     appFolder/scheduling.py is then the only check against double
+#     bookings.
+#
+# Nothing here applies to Postgres.
+
+
+class JSONArray(ARRAY):
+    # ARRAY as the SQLite dialects see it
+
+    def bind_processor(self, dialect):
+        item = self.item_type.dialect_impl(dialect).bind_processor(dialect)
+
+        def process(value):
+            if value is None:
+                return None
+            return json.dumps([item(v) if item else v for v in value])
+        return process
+
+    def result_processor(self, dialect, coltype):
+        item = self.item_type.dialect_impl(dialect).result_processor(dialect, coltype)
+
+        def process(value):
+            if value is None:
+                return None
+            return [item(v) if item else v for v in json.loads(value)]
+        return process
+
+
+# the pysqlite dialect (and aiosqlite, which extends it) keeps its own
+# copy of the base colspecs
+for _dialect in (SQLiteDialect, SQLiteDialect_pysqlite):
+    _dialect.colspecs = {**_dialect.colspecs, ARRAY: JSONArray}
+
+
+@compiles(ARRAY, 'sqlite')
+def _array_as_json(type_, compiler, **kw):
+    return 'JSON'
+
+
+@compiles(ExcludeConstraint, 'sqlite')
+def _no_exclude_constraint(constraint, compiler, **kw):
+    return None
@@ -0,0 +1,108 @@
+import csv
+import enum
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from appFolder import db
+from appFolder.model import Venue, Artist, Show
+from appFolder.serialize import dumps
+
+#----------------------------------------------------------------------------#
+# Bulk export.
+#----------------------------------------------------------------------------#
+
+# Streams whole tables to gzipped NDJSON or CSV through a server-side
+# cursor (yield_per), so memory use does not depend on table size. With
+# since= only rows whose updated_at is newer are written. Each run records
+# its start time per table in export-manifest.json in the output
+# directory, which "--since last" picks up for the next incremental run.
+# Deleted rows are not part of an incremental export. Columns are named
+# and formatted the way `flask import` reads them back.
+
+MODELS = {'venues': Venue, 'artists': Artist, 'shows': Show}
+MANIFEST = 'export-manifest.json'
+
+# column -> the field name the forms (and so the importer) use
+FIELD_NAMES = {'seeking_decription': 'seeking_description'}
+
+# a row updated by a transaction that was still open when the previous
+# export started only becomes visible afterwards; re-reading this much
+# of the past makes the feed at-least-once (consumers upsert by id)
+SINCE_OVERLAP = timedelta(minutes=5)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (list, tuple)):
+        return ';'.join(str(_csv_value(v)) for v in value)
+    return value
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def export_table(table, out, fmt='ndjson', since=None, batch_size=1000):
+    # write every (or every changed) row of table to the text stream out;
+    # returns the number of rows written
+    model = MODELS[table]
+    columns = [c.label(FIELD_NAMES.get(c.name, c.name)) for c in model.__table__.columns]
+    query = db.session.query(*columns)
+    if since is not None:
+        query = query.filter(model.updated_at > since - SINCE_OVERLAP)
+    rows = query.order_by(model.id).yield_per(batch_size)
+
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow([c.name for c in columns])
+        for row in rows:
+            writer.writerow([_csv_value(v) for v in row])
+            count += 1
+    else:
+        for row in rows:
+            out.write(dumps(row._asdict()) + '\n')
+            count += 1
+    return count
+
+
+def export_tables(tables, directory, fmt='ndjson', since=None, batch_size=1000):
+    # export each table to <directory>/<table>.<fmt>.gz; since may be a
+    # datetime, 'last' (per table, from the manifest) or None for a full
+    # dump. Returns {table: rows written}.
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    written = {}
+    for table in tables:
+        started = datetime.utcnow()
+        table_since = since
+        if since == 'last':
+            last = manifest.get(table, {}).get('exported_at')
+            table_since = datetime.fromisoformat(last) if last else None
+        path = os.path.join(directory, f'{table}.{fmt}.gz')
+        with gzip.open(path, 'wt', newline='', encoding='utf-8') as out:
+            written[table] = export_table(table, out, fmt, table_since, batch_size)
+        db.session.rollback()
+        manifest[table] = {
+            "exported_at": started.isoformat(),
+            "since": table_since.isoformat() if table_since else None,
+            "rows": written[table],
+            "file": os.path.basename(path)
+        }
+        _write_manifest(directory, manifest)
+    return written
@@ -1,21 +1,33 @@
 from datetime import datetime
 from flask_wtf import Form
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
-from wtforms.validators import DataRequired, AnyOf, URL
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField, \
+    IntegerField
+from wtforms.validators import DataRequired, AnyOf, URL, Optional, NumberRange, Regexp
+from wtforms.widgets import HiddenInput
 
 
 class ShowForm(Form):
     artist_id = StringField(
-        'artist_id'
+        'artist_id',
+        validators=[DataRequired(), Regexp(r'^\d+$', message='Must be the id of an existing row.')]
     )
     venue_id = StringField(
-        'venue_id'
+        'venue_id',
+        validators=[DataRequired(), Regexp(r'^\d+$', message='Must be the id of an existing row.')]
     )
+    # the create page's format, and ISO 8601 as `flask export` writes it
     start_time = DateTimeField(
         'start_time',
+        format=['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f'],
         validators=[DataRequired()],
         default=datetime.today()
     )
+    # minutes; at most appFolder.scheduling.MAX_DURATION
+    duration = IntegerField(
+        'duration',
+        validators=[Optional(), NumberRange(min=1, max=24 * 60)],
+        default=120
+    )
 
 
 class VenueForm(Form):
@@ -128,6 +140,9 @@ class VenueForm(Form):
         'seeking_description'
     )
 
+    # the row version the edit form was rendered from (appFolder/writes.py)
+    version = IntegerField('version', widget=HiddenInput(), validators=[Optional()])
+
 
 class ArtistForm(Form):
     name = StringField(
@@ -237,3 +252,5 @@ class ArtistForm(Form):
     seeking_description = StringField(
         'seeking_description'
     )
+
+    version = IntegerField('version', widget=HiddenInput(), validators=[Optional()])
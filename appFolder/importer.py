@@ -0,0 +1,285 @@
+import csv
+import enum
+import gzip
+import json
+import os
+from itertools import islice
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.datastructures import MultiDict
+from appFolder import db, cache, stats, writes, scheduling
+from appFolder.forms import VenueForm, ArtistForm, ShowForm
+from appFolder.model import Venue, Artist, Show
+
+#----------------------------------------------------------------------------#
+# Bulk import.
+#----------------------------------------------------------------------------#
+
+# Streams CSV or NDJSON rows in chunks. Each row is validated with the
+# same form class the create pages use, each chunk is inserted with one
+# executemany and committed on its own, and the last committed line is
+# checkpointed next to the input (<file>.import-state) so a rerun resumes
+# after it. Rows whose natural key already exists are skipped, which also
+# covers a crash between a commit and its checkpoint. Shows that would
+# double-book their venue or artist, against the database or another row
+# of the chunk, are rejected (see scheduling.py). Lines that are not a
+# JSON object, and the rows of a chunk whose insert the database refuses,
+# are reported through on_error like rows that fail validation.
+
+FALSE_VALUES = {'', '0', 'n', 'no', 'false', 'off'}
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='', encoding='utf-8')
+    return open(path, newline='', encoding='utf-8')
+
+
+def _parse_line(line):
+    try:
+        row = json.loads(line)
+    except ValueError as error:
+        raise ValueError(f'Not valid JSON: {error}')
+    if not isinstance(row, dict):
+        raise ValueError('Not a JSON object.')
+    return row
+
+
+def read_rows(path, fmt=None):
+    # (line number, dict) for every data row of a CSV or NDJSON file; an
+    # NDJSON line that holds no object comes as (line number, ValueError)
+    fmt = fmt or ('csv' if '.csv' in os.path.basename(path) else 'ndjson')
+    with _open(path) as f:
+        if fmt == 'csv':
+            for number, row in enumerate(csv.DictReader(f), start=2):
+                yield number, row
+        else:
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield number, _parse_line(line)
+                    except ValueError as error:
+                        yield number, error
+
+
+def _formdata(row, multi=('genres',), booleans=()):
+    data = MultiDict()
+    for field, value in row.items():
+        if value is None:
+            continue
+        if field in multi:
+            if isinstance(value, str):
+                value = [v.strip() for v in value.replace(';', ',').split(',') if v.strip()]
+            for v in value:
+                data.add(field, v)
+        elif field in booleans:
+            if str(value).strip().lower() not in FALSE_VALUES:
+                data.add(field, 'y')
+        else:
+            data.add(field, str(value))
+    return data
+
+
+def _plain(value):
+    return value.name if isinstance(value, enum.Enum) else value
+
+
+#  Per-table rules
+#  ----------------------------------------------------------------
+
+def _resolve_names(model, names):
+    # {name: id} for names that identify exactly one row
+    ids, ambiguous = {}, set()
+    for id, name in db.session.query(model.id, model.name).filter(model.name.in_(names)):
+        if name in ids:
+            ambiguous.add(name)
+        ids[name] = id
+    return {name: id for name, id in ids.items() if name not in ambiguous}
+
+
+def _prepare_shows(rows):
+    # shows may name their artist/venue ("artist", "venue") instead of
+    # giving ids; resolve the whole chunk with one query per table
+    artists = _resolve_names(Artist, {r['artist'] for _, r in rows if r.get('artist')})
+    venues = _resolve_names(Venue, {r['venue'] for _, r in rows if r.get('venue')})
+    prepared, errors = [], []
+    for number, row in rows:
+        row = dict(row)
+        problems = {}
+        for field, names in (('artist', artists), ('venue', venues)):
+            name = row.pop(field, None)
+            if not row.get(f'{field}_id') and name:
+                if name in names:
+                    row[f'{field}_id'] = names[name]
+                else:
+                    problems[field] = [f'no single {field} named {name!r}']
+            elif not str(row.get(f'{field}_id') or '').isdigit():
+                problems[f'{field}_id'] = ['Must be the id of an existing row.']
+        if problems:
+            errors.append((number, problems))
+        else:
+            prepared.append((number, row))
+    return prepared, errors
+
+
+def _check_shows(records):
+    # split (line, record) pairs into those that can be booked and
+    # (line, errors) for the ones that would double-book a venue or artist
+    found = scheduling.conflicts([record for _, record in records])
+    accepted, errors = [], []
+    for position, (number, record) in enumerate(records):
+        if position in found:
+            field, booking = found[position]
+            errors.append((number, {field: [scheduling.describe(field, booking)]}))
+        else:
+            accepted.append((number, record))
+    return accepted, errors
+
+
+def _shows_inserted(records):
+    # bulk inserts bypass the ORM flush that keeps the stats current
+    stats.refresh_shows({r['venue_id'] for r in records},
+                        {r['artist_id'] for r in records})
+
+
+TABLES = {
+    'venues': {
+        "model": Venue,
+        "form": VenueForm,
+        "record": writes.venue_values,
+        "booleans": ('seeking_talent',),
+        "key": ('name', 'city', 'state')
+    },
+    'artists': {
+        "model": Artist,
+        "form": ArtistForm,
+        "record": writes.artist_values,
+        "booleans": ('seeking_venue',),
+        "key": ('name', 'city', 'state')
+    },
+    'shows': {
+        "model": Show,
+        "form": ShowForm,
+        "record": writes.show_values,
+        "booleans": (),
+        "key": ('artist_id', 'venue_id', 'start_time'),
+        "prepare": _prepare_shows,
+        "check": _check_shows,
+        "inserted": _shows_inserted
+    }
+}
+
+
+#  Import
+#  ----------------------------------------------------------------
+
+def _checkpoint_path(path):
+    return path + '.import-state'
+
+
+def _load_checkpoint(path):
+    # the last committed line, if the checkpoint belongs to this exact file
+    try:
+        with open(_checkpoint_path(path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    stat = os.stat(path)
+    if state.get('size') != stat.st_size or state.get('mtime') != stat.st_mtime:
+        return 0
+    return state.get('line', 0)
+
+
+def _save_checkpoint(path, line):
+    stat = os.stat(path)
+    tmp = _checkpoint_path(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({"line": line, "size": stat.st_size, "mtime": stat.st_mtime}, f)
+    os.replace(tmp, _checkpoint_path(path))
+
+
+def _existing_keys(model, key, records):
+    columns = [getattr(model, k) for k in key]
+    wanted = {tuple(r[k] for k in key) for r in records}
+    rows = db.session.query(*columns).filter(tuple_(*columns).in_(list(wanted)))
+    return {tuple(_plain(v) for v in row) for row in rows}
+
+
+def import_file(table, path, fmt=None, chunk_size=1000, on_error=None):
+    # returns {"inserted", "skipped", "failed"} counts; on_error(line,
+    # errors) is called for every rejected row
+    spec = TABLES[table]
+    model = spec["model"]
+    on_error = on_error or (lambda line, errors: None)
+    counts = {"inserted": 0, "skipped": 0, "failed": 0}
+    resume_after = _load_checkpoint(path)
+
+    rows = ((n, r) for n, r in read_rows(path, fmt) if n > resume_after)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        errors = [(number, {"line": [str(row)]}) for number, row in chunk
+                  if isinstance(row, ValueError)]
+        chunk = [(number, row) for number, row in chunk if not isinstance(row, ValueError)]
+        if "prepare" in spec:
+            chunk, rejected = spec["prepare"](chunk)
+            errors += rejected
+        records = []
+        for number, row in chunk:
+            form = spec["form"](formdata=_formdata(row, booleans=spec["booleans"]),
+                                meta={'csrf': False})
+            if form.validate():
+                records.append((number, spec["record"](form)))
+            else:
+                errors.append((number, form.errors))
+
+        fresh = []
+        if records:
+            seen = _existing_keys(model, spec["key"], [record for _, record in records])
+            for number, record in records:
+                key = tuple(record[k] for k in spec["key"])
+                if key in seen:
+                    counts["skipped"] += 1
+                else:
+                    seen.add(key)
+                    fresh.append((number, record))
+        if fresh and "check" in spec:
+            fresh, rejected = spec["check"](fresh)
+            errors += rejected
+        try:
+            if fresh:
+                db.session.execute(model.__table__.insert(), [record for _, record in fresh])
+                if "inserted" in spec:
+                    spec["inserted"]([record for _, record in fresh])
+            db.session.commit()
+        except SQLAlchemyError as error:
+            # the whole chunk's insert is undone; report each of its rows
+            db.session.rollback()
+            message = str(getattr(error, 'orig', None) or error).splitlines()[0]
+            errors += [(number, {"database": [message]}) for number, _ in fresh]
+            fresh = []
+        fresh = [record for _, record in fresh]
+        _save_checkpoint(path, max(number for number, _ in chunk + errors))
+
+        counts["inserted"] += len(fresh)
+        counts["failed"] += len(errors)
+        for number, problems in sorted(errors, key=lambda e: e[0]):
+            on_error(number, problems)
+        _invalidate(table, fresh)
+
+    if os.path.exists(_checkpoint_path(path)):
+        os.remove(_checkpoint_path(path))
+    return counts
+
+
+def _invalidate(table, records):
+    if not records:
+        return
+    if table == 'shows':
+        cache.invalidate('shows', 'venues',
+                         *{f"venue:{r['venue_id']}" for r in records},
+                         *{f"artist:{r['artist_id']}" for r in records})
+    else:
+        cache.invalidate(table)
@@ -1,11 +1,43 @@
-from appFolder import db
+import enum
+from datetime import datetime
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from appFolder import db, dialects  # noqa: F401 (the SQLite stand-in)
+from appFolder.forms import VenueForm
 #----------------------------------------------------------------------------#
 # Models.
 #----------------------------------------------------------------------------#
 
+class Choice(enum.Enum):
+    # a form choice; renders as its value ('NM', not 'State.NM') in the
+    # templates
+    def __str__(self):
+        return self.value
+
+
+# the venue form's choices; a member's name is its value, and the name is
+# what the database stores
+State = Choice('State', [(value, value) for value, _ in VenueForm.state.kwargs['choices']])
+Genre = Choice('Genre', [(value, value) for value, _ in VenueForm.genres.kwargs['choices']])
+
+
+def _trigram_index(table, column):
+    # lets ILIKE '%term%' and similarity() in appFolder/search.py use an
+    # index; needs pg_trgm
+    return db.Index(f'ix_{table}_{column}_trgm', column, postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'})
+
 
 class Venue(db.Model):
     __tablename__ = 'Venue'
+    __table_args__ = (
+        # sort order of the keyset paginated /venues listing
+        db.Index('ix_venue_city_state_name_id', 'city', 'state', 'name', 'id'),
+        _trigram_index('venue', 'name'),
+        _trigram_index('venue', 'city'),
+        # a two letter code, matched by equality
+        db.Index('ix_venue_state', 'state'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(), nullable=False)
@@ -19,15 +51,31 @@ class Venue(db.Model):
     website_link = db.Column(db.String(120), nullable=False)
     seeking_talent = db.Column(db.Boolean, nullable=False, default=False)
     seeking_decription = db.Column(db.String(500), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+    # bumped by every write; see appFolder/writes.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     shows = db.relationship('Show', backref='venue', lazy=True)
 
+    __mapper_args__ = {'version_id_col': version}
+
     def __repr__(self):
         return f'<Venue {self.id}, {self.name}>'
     # TODO: implement any missing fields, as a database migration using Flask-Migrate
 
 
+event.listen(Venue.__table__, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
+
+
 class Artist(db.Model):
     __tablename__ = 'Artist'
+    __table_args__ = (
+        db.Index('ix_artist_name_id', 'name', 'id'),
+        _trigram_index('artist', 'name'),
+        _trigram_index('artist', 'city'),
+        db.Index('ix_artist_state', 'state'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(), nullable=False)
@@ -40,21 +88,79 @@ class Artist(db.Model):
     seeking_venue = db.Column(db.Boolean, nullable=False, default=False)
     seeking_description = db.Column(db.String(500), nullable=False)
     genres = db.Column(db.ARRAY(db.String()), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+    # bumped by every write; see appFolder/writes.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     shows = db.relationship('Show', backref='artist', lazy=True)
 
+    __mapper_args__ = {'version_id_col': version}
+
     def __repr__(self):
         return f'<Artist {self.id}, {self.name}, {self.seeking_description}>'
 
 
+# [start_time, start_time + duration), the time a show books its venue and
+# artist for; timestamps are naive, hence tsrange rather than tstzrange
+_start_time, _duration = db.column('start_time'), db.column('duration')
+SHOW_PERIOD = db.func.tsrange(_start_time, _start_time + _duration * db.text("interval '1 minute'"))
+
+
 class Show(db.Model):
     __tablename__ = 'Show'
+    __table_args__ = (
+        db.Index('ix_show_start_time_id', 'start_time', 'id'),
+        # per venue / per artist upcoming-past splits and counts
+        db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+        # no double bookings (GiST, with btree_gist for the ids); checked
+        # up front by appFolder/scheduling.py
+        ExcludeConstraint(('venue_id', '='), (SHOW_PERIOD, '&&'), using='gist',
+                          name='ex_show_venue_period'),
+        ExcludeConstraint(('artist_id', '='), (SHOW_PERIOD, '&&'), using='gist',
+                          name='ex_show_artist_period'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey(
         'Artist.id'), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
     start_time = db.Column(db.DateTime, nullable=False)
+    # minutes
+    duration = db.Column(db.Integer, nullable=False, default=120, server_default='120')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f'<Show {self.id} {self.artist_id} {self.venue_id} {self.start_time}>'
+
+
+event.listen(Show.__table__, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(dialect='postgresql'))
+
+
+# Denormalized show statistics, one row per venue / artist that has shows;
+# kept current by appFolder/stats.py. upcoming/past are relative to the
+# last refresh, which `flask refresh-stats` rolls forward.
+
+class VenueStats(db.Model):
+    __tablename__ = 'VenueStats'
+
+    venue_id = db.Column(db.Integer, db.ForeignKey(
+        'Venue.id', ondelete='CASCADE'), primary_key=True)
+    upcoming_count = db.Column(db.Integer, nullable=False, default=0)
+    past_count = db.Column(db.Integer, nullable=False, default=0)
+    next_show_at = db.Column(db.DateTime, index=True)
+    last_show_at = db.Column(db.DateTime)
+
+
+class ArtistStats(db.Model):
+    __tablename__ = 'ArtistStats'
+
+    artist_id = db.Column(db.Integer, db.ForeignKey(
+        'Artist.id', ondelete='CASCADE'), primary_key=True)
+    upcoming_count = db.Column(db.Integer, nullable=False, default=0)
+    past_count = db.Column(db.Integer, nullable=False, default=0)
+    next_show_at = db.Column(db.DateTime, index=True)
+    last_show_at = db.Column(db.DateTime)
@@ -0,0 +1,183 @@
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from appFolder import app, db
+from appFolder.pool import CHECKOUT_BUCKETS
+
+#----------------------------------------------------------------------------#
+# Monitoring.
+#----------------------------------------------------------------------------#
+
+# /metrics in the Prometheus text format. Values are per worker process;
+# scrape each worker (or sum them) when running under gunicorn. The pool
+# metrics carry an engine label, "primary" or "replica-N" (N counting
+# from 1 in SQLALCHEMY_REPLICA_URIS order); the endpoint is public, so
+# the labels say nothing about where the databases are.
+
+
+def _metric(lines, name, kind, help, samples):
+    lines.append(f'# HELP {name} {help}')
+    lines.append(f'# TYPE {name} {kind}')
+    for suffix, value in samples:
+        lines.append(f'{name}{suffix} {value}')
+
+
+def _labels(**labels):
+    # {name="value",...}, values escaped as the text format wants
+    escaped = {name: str(value).replace('\\', '\\\\').replace('"', '\\"')
+               for name, value in labels.items()}
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped.items()) + '}'
+
+
+def _engines():
+    # (label, engine) of the sync engines with a connection pool
+    return [('primary', db.engine)] + [
+        (f'replica-{n}', replica.engine)
+        for n, replica in enumerate(db.replicas().replicas, start=1)]
+
+
+def pool_metrics():
+    pools = [(label, engine.pool) for label, engine in _engines()]
+    lines = []
+    # SQLite stand-ins use pools without size/overflow bookkeeping
+    for name, help, attr in (
+            ('fyyur_db_pool_size', 'Configured pool size.', 'size'),
+            ('fyyur_db_pool_in_use', 'Connections currently checked out.', 'checkedout'),
+            ('fyyur_db_pool_overflow', 'Connections open beyond pool_size.', 'overflow')):
+        samples = [(_labels(engine=label), getattr(pool, attr)())
+                   for label, pool in pools if hasattr(pool, attr)]
+        if samples:
+            _metric(lines, name, 'gauge', help, samples)
+
+    instrumented = [(label, pool.stats) for label, pool in pools if hasattr(pool, 'stats')]
+    if not instrumented:
+        return lines
+    waits, timeouts, histogram = [], [], []
+    for label, stats in instrumented:
+        with stats.lock:
+            waits.append((_labels(engine=label), stats.waits))
+            timeouts.append((_labels(engine=label), stats.timeouts))
+            cumulative = 0
+            for bound, count in zip(CHECKOUT_BUCKETS, stats.buckets):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else bound
+                histogram.append(('_bucket' + _labels(engine=label, le=le), cumulative))
+            histogram += [('_sum' + _labels(engine=label), round(stats.checkout_seconds, 6)),
+                          ('_count' + _labels(engine=label), stats.checkouts)]
+    _metric(lines, 'fyyur_db_pool_waits_total', 'counter',
+            'Checkouts that found the pool exhausted.', waits)
+    _metric(lines, 'fyyur_db_pool_timeouts_total', 'counter',
+            'Checkouts that gave up after pool_timeout.', timeouts)
+    _metric(lines, 'fyyur_db_pool_checkout_seconds', 'histogram',
+            'Time spent waiting for a pooled connection.', histogram)
+    return lines
+
+
+@app.route('/metrics')
+def metrics():
+    return Response('\n'.join(pool_metrics()) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+#  Per-request query profile
+#  ----------------------------------------------------------------
+
+# Every statement run through any engine is timed. During a request the
+# totals go to a Server-Timing header ("db" and "app" durations), and a
+# request over SLOW_REQUEST_QUERIES statements or SLOW_REQUEST_MS is
+# logged as a warning with its slowest statements, which ends up in
+# error.log outside debug mode. A run of near-identical statements in
+# that log is usually an N+1 loop.
+
+class QueryProfile:
+    def __init__(self, keep=5):
+        self.count = 0
+        self.seconds = 0.0
+        self.keep = keep
+        self.slowest = []
+        self.statements = []
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements.append(statement)
+        heapq.heappush(self.slowest, (seconds, self.count, statement))
+        if len(self.slowest) > self.keep:
+            heapq.heappop(self.slowest)
+
+    def slowest_first(self):
+        return [(seconds, statement) for seconds, _, statement
+                in sorted(self.slowest, reverse=True)]
+
+
+# profiles opened with max_queries() in this thread
+_local = threading.local()
+
+
+def _active_profiles():
+    profiles = list(getattr(_local, 'profiles', ()))
+    if has_request_context() and 'query_profile' in g:
+        profiles.append(g.query_profile)
+    return profiles
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_started'].pop()
+    for profile in _active_profiles():
+        profile.record(statement, seconds)
+
+
+@app.before_request
+def start_query_profile():
+    g.request_started = time.perf_counter()
+    g.query_profile = QueryProfile(app.config['SLOW_REQUEST_STATEMENTS'])
+
+
+@app.after_request
+def finish_query_profile(response):
+    profile = g.pop('query_profile', None)
+    if profile is None:
+        return response
+    total_ms = (time.perf_counter() - g.request_started) * 1000
+    db_ms = profile.seconds * 1000
+    if app.config['SERVER_TIMING_ENABLED']:
+        response.headers.add('Server-Timing',
+                             f'db;dur={db_ms:.1f};desc="{profile.count} queries", '
+                             f'app;dur={total_ms:.1f}')
+
+    if (profile.count > app.config['SLOW_REQUEST_QUERIES']
+            or total_ms > app.config['SLOW_REQUEST_MS']):
+        lines = [f'{seconds * 1000:8.1f}ms  {" ".join(statement.split())}'
+                 for seconds, statement in profile.slowest_first()]
+        app.logger.warning('slow request %s %s: %d queries, %.1fms in db, %.1fms total\n%s',
+                           request.method, request.full_path.rstrip('?'),
+                           profile.count, db_ms, total_ms, '\n'.join(lines))
+    return response
+
+
+@contextmanager
+def max_queries(limit):
+    # fails with AssertionError if the block runs more than `limit`
+    # statements, e.g.
+    #
+    #   with app.test_client() as client, max_queries(3):
+    #       client.get('/venues')
+    profile = QueryProfile()
+    profiles = _local.__dict__.setdefault('profiles', [])
+    profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        profiles.remove(profile)
+    if profile.count > limit:
+        statements = '\n'.join(' '.join(s.split()) for s in profile.statements)
+        raise AssertionError(f'expected at most {limit} queries, got {profile.count}:\n{statements}')
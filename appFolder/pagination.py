@@ -0,0 +1,94 @@
+import base64
+import enum
+import json
+from datetime import datetime
+from flask import request, has_request_context
+from sqlalchemy import DateTime, tuple_
+from appFolder import app
+
+#----------------------------------------------------------------------------#
+# Keyset pagination.
+#----------------------------------------------------------------------------#
+
+# Listings are paged by seeking past the sort key of the last row seen
+# ("WHERE (name, id) > (:name, :id) ORDER BY name, id LIMIT n") rather than
+# by OFFSET, so every page costs one index range scan. Cursors are the
+# sort key of a boundary row, JSON encoded and base64'd for the URL.
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    # returns None for anything that isn't a cursor we issued, which the
+    # listings treat as "first page"
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(columns):
+            return None
+        return [datetime.fromisoformat(v) if isinstance(c.type, DateTime) else v
+                for c, v in zip(columns, values)]
+    except (ValueError, TypeError):
+        return None
+
+
+def page_size():
+    limit = app.config['LISTING_PAGE_SIZE']
+    if has_request_context():
+        limit = request.args.get('limit', limit, type=int)
+    return max(1, min(limit, app.config['LISTING_MAX_PAGE_SIZE']))
+
+
+def keyset_plan(query, columns, after=None, before=None, limit=None):
+    # the page query for keyset_page, plus the function that turns its rows
+    # into the page; split so the async views can run the query themselves
+    limit = limit or page_size()
+    key = tuple_(*columns)
+    after = after and decode_cursor(after, columns)
+    before = before and decode_cursor(before, columns)
+
+    if before:
+        query = query.filter(key < tuple_(*before)) \
+            .order_by(*[c.desc() for c in columns]) \
+            .limit(limit + 1)
+    else:
+        if after:
+            query = query.filter(key > tuple_(*after))
+        query = query.order_by(*columns).limit(limit + 1)
+
+    def cursor(row):
+        return encode_cursor([getattr(row, c.key) for c in columns])
+
+    def finish(rows):
+        if before:
+            has_prev, has_next = len(rows) > limit, True
+            rows = rows[:limit][::-1]
+        else:
+            has_prev, has_next = bool(after), len(rows) > limit
+            rows = rows[:limit]
+        return {
+            "items": rows,
+            "prev_cursor": cursor(rows[0]) if rows and has_prev else None,
+            "next_cursor": cursor(rows[-1]) if rows and has_next else None
+        }
+
+    return query, finish
+
+
+def keyset_page(query, columns, after=None, before=None, limit=None):
+    # one page of query ordered by columns (which must also be selected,
+    # under their own names). Returns a dict with the rows and the cursors
+    # for the neighbouring pages, None where there is no such page.
+    query, finish = keyset_plan(query, columns, after, before, limit)
+    return finish(query.all())
@@ -0,0 +1,64 @@
+import math
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+#----------------------------------------------------------------------------#
+# Connection pool instrumentation.
+#----------------------------------------------------------------------------#
+
+# Upper bounds (seconds) of the checkout latency histogram buckets
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, math.inf)
+
+
+class PoolStats:
+    # counters for every checkout from one pool in this process
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.buckets = [0] * len(CHECKOUT_BUCKETS)
+
+    def observe(self, seconds, waited, timed_out=False):
+        with self.lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.timeouts += timed_out
+            self.checkout_seconds += seconds
+            for i, bound in enumerate(CHECKOUT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+                    break
+
+
+class InstrumentedQueuePool(QueuePool):
+    # QueuePool that records how long each checkout took and whether it
+    # had to wait for another request to return a connection, in its own
+    # PoolStats (one per engine: the primary and each replica)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # the pool that replaces this one (engine.dispose(), a fork)
+        # keeps counting where this one left off
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        capacity = self.size() + self._max_overflow
+        waited = self._max_overflow >= 0 and self.checkedout() >= capacity
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.observe(time.perf_counter() - started, waited, timed_out=True)
+            raise
+        self.stats.observe(time.perf_counter() - started, waited)
+        return connection
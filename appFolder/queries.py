@@ -0,0 +1,293 @@
+from datetime import datetime
+from bisect import bisect_right
+from itertools import groupby
+from flask import request
+from sqlalchemy import func, DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from appFolder import app, db, cache, search, stats
+from appFolder.model import Venue, Artist, Show, VenueStats
+from appFolder.pagination import keyset_page, keyset_plan
+from appFolder.viewmodels import (VenueShow, ArtistShow, VenueDetail, ArtistDetail,
+                                  ShowSummary, VenueSummary, ArtistSummary, AreaGroup)
+
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+
+# sort keys of the keyset paginated listings
+VENUE_ORDER = [Venue.city, Venue.state, Venue.name, Venue.id]
+ARTIST_ORDER = [Artist.name, Artist.id]
+SHOW_ORDER = [Show.start_time, Show.id]
+
+
+def venue_rows():
+    # upcoming counts come from the precomputed VenueStats row (see
+    # appFolder/stats.py), so no aggregation over Show per page
+    return db.session.query(
+        Venue.id,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+        func.coalesce(VenueStats.upcoming_count, 0).label('num_upcoming_shows')
+    ).outerjoin(VenueStats, VenueStats.venue_id == Venue.id)
+
+
+def artist_rows():
+    return db.session.query(Artist.id, Artist.name)
+
+
+class latest(FunctionElement):
+    # the latest of its timestamp arguments: greatest() on Postgres, the
+    # multi-argument max() on SQLite
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(latest)
+def _latest(element, compiler, **kw):
+    return f'greatest({compiler.process(element.clauses, **kw)})'
+
+
+@compiles(latest, 'sqlite')
+def _latest_sqlite(element, compiler, **kw):
+    return f'max({compiler.process(element.clauses, **kw)})'
+
+
+def show_rows():
+    # shows with their venue and artist columns joined in, no lazy loads.
+    # updated_at is the last change to any of the three rows, which keys
+    # the cached show tile.
+    return db.session.query(
+        Show.id,
+        Show.venue_id,
+        Venue.name.label('venue_name'),
+        Show.artist_id,
+        Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link'),
+        Show.start_time,
+        latest(Show.updated_at, Venue.updated_at, Artist.updated_at).label('updated_at')
+    ).join(Venue, Venue.id == Show.venue_id) \
+        .join(Artist, Artist.id == Show.artist_id)
+
+
+def venue_listing(after=None, before=None):
+    return keyset_page(venue_rows(), VENUE_ORDER, after=after, before=before)
+
+
+def artist_listing(after=None, before=None):
+    return keyset_page(artist_rows(), ARTIST_ORDER, after=after, before=before)
+
+
+def show_listing(after=None, before=None):
+    return keyset_page(show_rows(), SHOW_ORDER, after=after, before=before)
+
+
+def summaries(rows, view_model):
+    # listing rows as view models for the templates (the API serialises
+    # the rows themselves)
+    return [view_model(*row) for row in rows]
+
+
+def group_areas(rows):
+    # a single pass over (city/state ordered) venue rows to build the areas
+    return [AreaGroup(city, state, [
+        VenueSummary(venue.id, venue.name, venue.num_upcoming_shows) for venue in venues
+    ]) for (city, state), venues in groupby(rows, key=lambda r: (r.city, r.state))]
+
+
+def venue_areas(after=None, before=None):
+    # one statement per page of the /venues listing
+    page = venue_listing(after=after, before=before)
+    page["items"] = group_areas(page["items"])
+    return page
+
+
+def search_results(model, search_term, page=1):
+    # one page of ranked search hits plus their upcoming show counts:
+    # a fixed number of round trips regardless of how many rows match
+    hits = search.search(model, search_term, page=page)
+    counts = stats.upcoming_counts(model, [row.id for row in hits.items])
+    return {
+        "count": hits.total,
+        "page": hits.page,
+        "prev_page": hits.prev_num if hits.has_prev else None,
+        "next_page": hits.next_num if hits.has_next else None,
+        "data": [{
+            "id": row.id,
+            "name": row.name,
+            "num_upcoming_shows": counts.get(row.id, 0)
+        } for row in hits.items]
+    }
+
+
+def _counterpart(model):
+    # (own foreign key, counterpart model, counterpart foreign key, prefix,
+    # view model of one show on the page)
+    if model is Venue:
+        return Show.venue_id, Artist, Show.artist_id, 'artist', VenueShow
+    return Show.artist_id, Venue, Show.venue_id, 'venue', ArtistShow
+
+
+def timeline_query(model, entity_id):
+    # every show of one Venue or Artist, oldest first, together with the
+    # counterpart's name and image, in a single statement
+    key, other, other_key, prefix, _ = _counterpart(model)
+    return db.session.query(
+        other.id.label(f'{prefix}_id'),
+        other.name.label(f'{prefix}_name'),
+        other.image_link.label(f'{prefix}_image_link'),
+        Show.start_time
+    ).join(other, other.id == other_key) \
+        .filter(key == entity_id) \
+        .order_by(Show.start_time)
+
+
+def timeline_rows(model, entity_id):
+    return timeline_query(model, entity_id).all()
+
+
+def timeline(model, past, upcoming):
+    # the past/upcoming part of a detail page from its two lists of
+    # timeline rows
+    entry = _counterpart(model)[4]
+    return {
+        "past_shows": [entry(*row) for row in past],
+        "upcoming_shows": [entry(*row) for row in upcoming],
+        "past_shows_count": len(past),
+        "upcoming_shows_count": len(upcoming)
+    }
+
+
+def show_timeline(model, entity_id, now=None):
+    # past/upcoming shows and counts for a detail page. The sorted shows
+    # are split with a bisect on now and the result is cached until the
+    # next upcoming show starts (when the split would change) or until a
+    # write invalidates the entity's tag.
+    tag = f'{model.__name__.lower()}:{entity_id}'
+
+    def build():
+        at = now or datetime.now()
+        rows = timeline_rows(model, entity_id)
+        split = bisect_right([row.start_time for row in rows], at)
+        ttl = app.config['TIMELINE_CACHE_TTL']
+        if split < len(rows):
+            ttl = min(ttl, (rows[split].start_time - at).total_seconds())
+        return timeline(model, rows[:split], rows[split:]), ttl
+
+    if now is not None:
+        return build()[0]
+    return cache.memoize('timeline:' + tag, [tag], build)
+
+
+# the columns each detail page shows, named as the view model names them
+DETAIL_COLUMNS = {
+    Venue: [
+        Venue.id,
+        Venue.name,
+        Venue.genres,
+        Venue.address,
+        Venue.city,
+        Venue.state,
+        Venue.phone,
+        Venue.website_link.label('website'),
+        Venue.facebook_link,
+        Venue.seeking_talent,
+        Venue.seeking_decription.label('seeking_description'),
+        Venue.image_link
+    ],
+    Artist: [
+        Artist.id,
+        Artist.name,
+        Artist.genres,
+        Artist.city,
+        Artist.state,
+        Artist.phone,
+        Artist.website_link.label('website'),
+        Artist.facebook_link,
+        Artist.seeking_venue,
+        Artist.seeking_description,
+        Artist.image_link
+    ]
+}
+
+DETAILS = {Venue: VenueDetail, Artist: ArtistDetail}
+
+
+def detail_query(model, entity_id):
+    return db.session.query(*DETAIL_COLUMNS[model]).filter(model.id == entity_id)
+
+
+def build_detail(model, row, timeline):
+    return DETAILS[model](**row._asdict(), **timeline)
+
+
+def venue_detail(venue_id):
+    # everything the venue page shows as a VenueDetail, or None for an
+    # unknown id
+    row = detail_query(Venue, venue_id).first()
+    if row is None:
+        return None
+    return build_detail(Venue, row, show_timeline(Venue, venue_id))
+
+
+def artist_detail(artist_id):
+    # everything the artist page shows as an ArtistDetail, or None for an
+    # unknown id
+    row = detail_query(Artist, artist_id).first()
+    if row is None:
+        return None
+    return build_detail(Artist, row, show_timeline(Artist, artist_id))
+
+
+#  Page versions
+#  ----------------------------------------------------------------
+
+# The rows behind each page's ETag/Last-Modified (see cache.conditional):
+# whatever changes the rendered page changes these rows.
+
+def _page_version(query, order):
+    # (id, updated_at) of every row on the requested listing page
+    return keyset_plan(query, order, after=request.args.get('after'),
+                       before=request.args.get('before'))[0]
+
+
+def venues_version():
+    # the page's rows carry each venue's upcoming count, which a new show
+    # changes without touching the venue row
+    return _page_version(venue_rows().with_entities(
+        Venue.id, Venue.updated_at, VenueStats.upcoming_count), VENUE_ORDER)
+
+
+def artists_version():
+    return _page_version(db.session.query(Artist.id, Artist.updated_at), ARTIST_ORDER)
+
+
+def shows_version():
+    return _page_version(show_rows().with_entities(Show.id, latest(
+        Show.updated_at, Venue.updated_at, Artist.updated_at)), SHOW_ORDER)
+
+
+def detail_version(model, entity_id):
+    # the entity's and its shows' latest changes plus how many of the
+    # shows are still upcoming, which moves as they start
+    key, other, other_key, _, _ = _counterpart(model)
+    return db.session.query(
+        model.updated_at,
+        func.max(Show.updated_at),
+        func.max(other.updated_at),
+        func.count(Show.id),
+        func.count(Show.id).filter(Show.start_time > datetime.now())
+    ).outerjoin(Show, key == model.id) \
+        .outerjoin(other, other.id == other_key) \
+        .filter(model.id == entity_id) \
+        .group_by(model.id)
+
+
+def venue_version(venue_id):
+    return detail_version(Venue, venue_id)
+
+
+def artist_version(artist_id):
+    return detail_version(Artist, artist_id)
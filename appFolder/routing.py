@@ -0,0 +1,167 @@
+import itertools
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, session, has_request_context
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import create_engine, exc, orm
+from config import engine_options
+from appFolder.pool import InstrumentedQueuePool
+
+#----------------------------------------------------------------------------#
+# Read replica routing.
+#----------------------------------------------------------------------------#
+
+# Views marked @read_only send their SELECTs to one of the replicas in
+# SQLALCHEMY_REPLICA_URIS, round robin, skipping any replica whose last
+# health check failed or showed more than REPLICA_MAX_LAG seconds of
+# replication lag. Everything else, and every flush or INSERT/UPDATE/
+# DELETE from any view, goes to the primary.
+#
+# A request that flushes or runs an INSERT/UPDATE/DELETE construct (raw
+# text() writes are not recognised) stamps the user's session, and for
+# the next READ_YOUR_WRITES_SECONDS that user's read-only views use the
+# primary too, so the redirect after an edit shows the edit rather than a
+# replica that has not replayed it yet.
+
+log = logging.getLogger(__name__)
+
+# seconds of replay lag on a Postgres standby; 0 when it has replayed all
+# it received (an idle standby's last replay timestamp can be old)
+PG_REPLICATION_LAG = '''
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END
+'''
+
+
+class Replica:
+    def __init__(self, engine, interval, max_lag):
+        self.engine = engine
+        self.interval = interval
+        self.max_lag = max_lag
+        self.healthy = True
+        self.checked_at = None
+
+    def available(self):
+        # re-checked at most every `interval` seconds
+        now = time.monotonic()
+        if self.checked_at is None or now - self.checked_at >= self.interval:
+            self.checked_at = now
+            self.healthy = self.check()
+        return self.healthy
+
+    def check(self):
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == 'postgresql':
+                    lag = conn.exec_driver_sql(PG_REPLICATION_LAG).scalar() or 0
+                    if lag > self.max_lag:
+                        log.warning('replica %s is %.1fs behind, skipping it',
+                                    self.engine.url.render_as_string(), lag)
+                        return False
+                else:
+                    conn.exec_driver_sql('SELECT 1')
+            return True
+        except exc.DBAPIError as e:
+            log.warning('replica %s failed its health check: %s',
+                        self.engine.url.render_as_string(), e.orig)
+            return False
+
+
+class ReplicaSet:
+    def __init__(self, config):
+        self.lock = threading.Lock()
+        self.replicas = [Replica(_engine(config, uri), config['REPLICA_HEALTH_INTERVAL'],
+                                 config['REPLICA_MAX_LAG'])
+                         for uri in config['SQLALCHEMY_REPLICA_URIS']]
+        self.order = itertools.cycle(range(len(self.replicas)))
+
+    def pick(self):
+        # the next available replica's engine, or None for the primary
+        if not self.replicas:
+            return None
+        with self.lock:
+            start = next(self.order)
+        count = len(self.replicas)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.available():
+                return replica.engine
+        return None
+
+
+def _engine(config, uri):
+    options = engine_options(config, uri)
+    if 'pool_size' in options:
+        options['poolclass'] = InstrumentedQueuePool
+    return create_engine(uri, **options)
+
+
+#  Session
+#  ----------------------------------------------------------------
+
+def _reading():
+    if not (has_request_context() and g.get('db_read_only')) or g.get('db_wrote'):
+        return False
+    wrote_at = session.get('db_wrote_at')
+    return wrote_at is None or \
+        time.time() - wrote_at >= current_app.config['READ_YOUR_WRITES_SECONDS']
+
+
+class RoutingSession(SignallingSession):
+    def __init__(self, db, **options):
+        self.db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            if has_request_context():
+                g.db_wrote = True
+        elif _reading():
+            engine = self.db.replicas().pick()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def __init__(self, app=None, **kwargs):
+        self._replicas = {}
+        self._replicas_lock = threading.Lock()
+        super().__init__(app, **kwargs)
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def replicas(self):
+        # one ReplicaSet per app, built on first use
+        app = self.get_app()
+        with self._replicas_lock:
+            if app not in self._replicas:
+                self._replicas[app] = ReplicaSet(app.config)
+            return self._replicas[app]
+
+
+def init_app(app):
+    @app.after_request
+    def remember_write(response):
+        if g.get('db_wrote'):
+            session['db_wrote_at'] = time.time()
+        return response
+
+
+def use_primary():
+    # send the rest of this request's queries to the primary
+    if has_request_context():
+        g.db_read_only = False
+
+
+def read_only(view):
+    # route this view's queries to a replica
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
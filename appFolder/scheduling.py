@@ -0,0 +1,143 @@
+from collections import namedtuple
+from datetime import timedelta
+from sqlalchemy import or_, select
+from appFolder import db
+from appFolder.model import Show
+
+#----------------------------------------------------------------------------#
+# Show scheduling.
+#----------------------------------------------------------------------------#
+
+# A show books its venue and its artist from start_time for duration
+# minutes. Two shows of the same venue or artist may not overlap, but
+# back to back is fine. On Postgres the exclusion constraints on Show
+# (see model.py) enforce this for every writer. The checks here give the
+# show form and the importer a readable error before the INSERT, and they
+# are the only check on SQLite stand-ins.
+#
+# A batch is checked in two sweeps by start time, so 10k shows cost a
+# sort and linear passes, not 10k x 10k comparisons. The shows already
+# booked in the batch's time window are fixed: the first sweep rejects
+# every show of the batch that overlaps one of them, whether it starts
+# during the stored show or before it. The second sweep runs over the
+# rest of the batch, keeping the booking that ends last for every venue
+# and artist seen so far; a show overlaps an earlier one exactly when it
+# starts before that end. When two shows of a batch overlap, the one
+# that starts first is kept.
+
+# the longest duration ShowForm accepts; bounds the window searched for
+# shows that may still be running when a new one starts
+MAX_DURATION = timedelta(hours=24)
+
+# SQLSTATE of an exclusion constraint violation
+EXCLUSION_VIOLATION = '23P01'
+
+# show_id is set for shows already in the database, position (the index
+# in the checked batch) for the others
+Booking = namedtuple('Booking', 'start_time end_time venue_id artist_id show_id position')
+
+FIELDS = ('venue_id', 'artist_id')
+
+
+def end_time(start_time, duration):
+    return start_time + timedelta(minutes=duration)
+
+
+def _booked(venue_ids, artist_ids, start, end):
+    # shows of these venues/artists that may overlap [start, end), read
+    # through the (venue_id, start_time) and (artist_id, start_time) indexes
+    rows = db.session.execute(
+        select(Show.id, Show.venue_id, Show.artist_id, Show.start_time, Show.duration)
+        .where(or_(Show.venue_id.in_(venue_ids), Show.artist_id.in_(artist_ids)))
+        .where(Show.start_time > start - MAX_DURATION, Show.start_time < end))
+    return [Booking(row.start_time, end_time(row.start_time, row.duration),
+                    row.venue_id, row.artist_id, row.id, None) for row in rows]
+
+
+def _against_stored(stored, batch):
+    # {position: (field, Booking)} for every batch booking that overlaps a
+    # stored one; at equal start times stored shows go first
+    bookings = sorted(stored + batch, key=lambda b: (b.start_time, b.position is not None,
+                                                     b.position or 0))
+    # (field, id) -> end of the stored booking that ends last so far
+    stored_end = {}
+    # (field, id) -> batch bookings seen since the last stored one
+    pending = {}
+    found = {}
+    for booking in bookings:
+        keys = [(field, getattr(booking, field)) for field in FIELDS]
+        if booking.position is None:
+            # a stored show that starts while pending batch shows still run
+            for key in keys:
+                for other in pending.pop(key, []):
+                    if other.end_time > booking.start_time:
+                        found.setdefault(other.position, (key[0], booking))
+                if key not in stored_end or stored_end[key].end_time < booking.end_time:
+                    stored_end[key] = booking
+            continue
+        clash = next(((key[0], stored_end[key]) for key in keys
+                      if key in stored_end and stored_end[key].end_time > booking.start_time),
+                     None)
+        if clash:
+            found[booking.position] = clash
+            continue
+        for key in keys:
+            pending.setdefault(key, []).append(booking)
+    return found
+
+
+def _sweep(bookings):
+    # {position: (field, Booking)} for every batch booking that overlaps
+    # one of the batch kept before it
+    bookings = sorted(bookings, key=lambda b: (b.start_time, b.position))
+    # (field, id) -> the kept booking that ends last so far
+    latest = {}
+    found = {}
+    for booking in bookings:
+        keys = [(field, getattr(booking, field)) for field in FIELDS]
+        clash = next(((key[0], latest[key]) for key in keys
+                      if key in latest and latest[key].end_time > booking.start_time), None)
+        if clash:
+            found[booking.position] = clash
+            continue
+        for key in keys:
+            if key not in latest or latest[key].end_time < booking.end_time:
+                latest[key] = booking
+    return found
+
+
+def _batch(shows):
+    return [Booking(show['start_time'], end_time(show['start_time'], show['duration']),
+                    show['venue_id'], show['artist_id'], None, position)
+            for position, show in enumerate(shows)]
+
+
+def conflicts(shows):
+    # {index in shows: (field, Booking)} for the shows (dicts with venue_id,
+    # artist_id, start_time and duration) that would double-book their
+    # venue or artist, against the database and against each other
+    if not shows:
+        return {}
+    batch = _batch(shows)
+    booked = _booked({b.venue_id for b in batch}, {b.artist_id for b in batch},
+                     min(b.start_time for b in batch), max(b.end_time for b in batch))
+    found = _against_stored(booked, batch)
+    found.update(_sweep([b for b in batch if b.position not in found]))
+    return found
+
+
+def overlapping(shows):
+    # as conflicts(), but only among the shows themselves; no database
+    return _sweep(_batch(shows))
+
+
+def describe(field, booking):
+    what = 'Venue' if field == 'venue_id' else 'Artist'
+    by = f'show {booking.show_id}' if booking.show_id else 'another show of this batch'
+    return (f'{what} {getattr(booking, field)} is already booked from '
+            f'{booking.start_time:%Y-%m-%d %H:%M} to {booking.end_time:%Y-%m-%d %H:%M} ({by}).')
+
+
+def is_conflict(error):
+    # whether an IntegrityError came from one of the exclusion constraints
+    return getattr(error.orig, 'pgcode', None) == EXCLUSION_VIOLATION
@@ -0,0 +1,64 @@
+from sqlalchemy import func, or_, case, false
+from appFolder import app, db
+from appFolder.model import State
+
+#----------------------------------------------------------------------------#
+# Search.
+#----------------------------------------------------------------------------#
+
+# On Postgres the name/city ILIKE filters are served by the pg_trgm GIN
+# indexes declared on the models and results are ranked by trigram
+# similarity. Other backends (SQLite in tests) get the same filter and a
+# coarser exact > prefix > substring ranking computed with CASE. The term
+# is matched literally: %, _ and the escape character itself are escaped.
+
+ESCAPE = '\\'
+
+
+def _literal(term):
+    # term with its LIKE wildcards escaped
+    for char in (ESCAPE, '%', '_'):
+        term = term.replace(char, ESCAPE + char)
+    return term
+
+
+def _uses_trigram():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _state(model, term):
+    # compares the column itself (no cast) so ix_venue_state/ix_artist_state
+    # can serve it; a term that is no state matches nothing
+    if term.upper() not in State.__members__:
+        return false()
+    return model.state == term.upper()
+
+
+def _rank(model, term):
+    if _uses_trigram():
+        return func.greatest(func.similarity(model.name, term),
+                             func.similarity(model.city, term))
+    return case(
+        (func.lower(model.name) == term.lower(), 3),
+        (model.name.ilike(f'{_literal(term)}%', escape=ESCAPE), 2),
+        (model.name.ilike(f'%{_literal(term)}%', escape=ESCAPE), 1),
+        else_=0
+    )
+
+
+def search(model, search_term, page=1, per_page=None):
+    # Venue/Artist rows (id, name) matching search_term on name, city or
+    # state, best match first, as a flask_sqlalchemy Pagination
+    term = search_term.strip()
+    per_page = per_page or app.config['SEARCH_RESULTS_PER_PAGE']
+    pattern = f'%{_literal(term)}%'
+    query = db.session.query(model.id, model.name).filter(or_(
+        model.name.ilike(pattern, escape=ESCAPE),
+        model.city.ilike(pattern, escape=ESCAPE),
+        _state(model, term)
+    ))
+    if term:
+        query = query.order_by(_rank(model, term).desc(), model.name, model.id)
+    else:
+        query = query.order_by(model.name, model.id)
+    return query.paginate(page=page, per_page=per_page, error_out=False)
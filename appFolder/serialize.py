@@ -0,0 +1,22 @@
+import enum
+import json
+from datetime import datetime
+
+#----------------------------------------------------------------------------#
+# JSON encoding.
+#----------------------------------------------------------------------------#
+
+# The compact JSON the API responses and the NDJSON exports are written
+# in: datetimes as ISO 8601, enums (State, Genre) as their value.
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    return json.dumps(payload, default=json_default, separators=(',', ':'))
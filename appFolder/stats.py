@@ -0,0 +1,164 @@
+from datetime import datetime
+from itertools import chain
+from sqlalchemy import event, func, inspect, select, text
+from appFolder import db, cache
+from appFolder.model import Venue, Artist, Show, VenueStats, ArtistStats
+
+#----------------------------------------------------------------------------#
+# Show statistics.
+#----------------------------------------------------------------------------#
+
+# VenueStats / ArtistStats hold upcoming_count, past_count, next_show_at
+# and last_show_at per entity so listings and search read one row instead
+# of aggregating Show. A row is recomputed from Show (an index range scan
+# on the show's venue_id/artist_id) whenever one of its shows is inserted,
+# moved or deleted:
+#
+# * ORM writes are picked up in after_flush, inside the same transaction
+# * bulk Core inserts (the importer) call refresh() themselves
+#
+# Counts are relative to the moment the row was computed, so
+# `flask refresh-stats` (run every minute or so from cron) recomputes the
+# rows whose next_show_at has passed. Entities without shows have no row;
+# readers coalesce the counts to 0.
+#
+# Two transactions refreshing the same row must not interleave: the
+# second one's DELETE would miss the row the first one inserts, and its
+# INSERT would then fail on the primary key. So a refresh first locks
+# the Venue/Artist rows (FOR NO KEY UPDATE, in id order, which does not
+# conflict with the FOR KEY SHARE locks Show's foreign keys take). A
+# concurrent refresh of the same entities waits there until the first
+# transaction ends, and its statements then see the first one's shows
+# and stats rows. A full rebuild locks the stats table instead. SQLite
+# has one writer at a time anyway.
+
+BATCH_SIZE = 1000
+
+# model -> (stats model, stats key, Show column pointing at the model)
+STATS = {
+    Venue: (VenueStats, VenueStats.venue_id, Show.venue_id),
+    Artist: (ArtistStats, ArtistStats.artist_id, Show.artist_id)
+}
+
+
+def _aggregate(show_key, now):
+    upcoming = Show.start_time > now
+    return select(
+        show_key,
+        func.count(Show.id).filter(upcoming),
+        func.count(Show.id).filter(~upcoming),
+        func.min(Show.start_time).filter(upcoming),
+        func.max(Show.start_time).filter(~upcoming)
+    ).group_by(show_key)
+
+
+def _columns(key):
+    return [key.name, 'upcoming_count', 'past_count', 'next_show_at', 'last_show_at']
+
+
+def _lock_table(stats, connection):
+    if db.engine.dialect.name == 'postgresql':
+        connection.execute(text(f'LOCK TABLE "{stats.__tablename__}" IN SHARE ROW EXCLUSIVE MODE'))
+
+
+def _lock_rows(model, ids, connection):
+    connection.execute(select(model.id).where(model.id.in_(ids))
+                       .order_by(model.id).with_for_update(key_share=True))
+
+
+def refresh(model, ids=None, now=None, connection=None):
+    # recompute the stats rows of the given Venue/Artist ids (all of them
+    # when ids is None) in the current transaction
+    stats, key, show_key = STATS[model]
+    now = now or datetime.now()
+    connection = connection or db.session
+    if ids is None:
+        _lock_table(stats, connection)
+        connection.execute(stats.__table__.delete())
+        connection.execute(stats.__table__.insert().from_select(
+            _columns(key), _aggregate(show_key, now)))
+        return
+
+    ids = sorted(set(ids) - {None})
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        _lock_rows(model, batch, connection)
+        connection.execute(stats.__table__.delete().where(key.in_(batch)))
+        connection.execute(stats.__table__.insert().from_select(
+            _columns(key), _aggregate(show_key, now).where(show_key.in_(batch))))
+
+
+def refresh_shows(venue_ids=(), artist_ids=(), connection=None):
+    refresh(Venue, venue_ids, connection=connection)
+    refresh(Artist, artist_ids, connection=connection)
+
+
+def roll_forward(now=None):
+    # recompute every row with a show that has started since it was
+    # computed; returns how many rows were rolled
+    now = now or datetime.now()
+    rolled = 0
+    for model, (stats, key, show_key) in STATS.items():
+        ids = [id for id, in db.session.query(key).filter(stats.next_show_at <= now)]
+        refresh(model, ids, now=now)
+        rolled += len(ids)
+    db.session.commit()
+    if rolled:
+        cache.invalidate('venues')
+    return rolled
+
+
+def rebuild():
+    for model in STATS:
+        refresh(model)
+    db.session.commit()
+    cache.invalidate('venues')
+
+
+def upcoming_counts(model, ids):
+    # {id: upcoming show count} for the ids that have a stats row
+    stats, key, _ = STATS[model]
+    ids = list(ids)
+    if not ids:
+        return {}
+    return dict(db.session.query(key, stats.upcoming_count).filter(key.in_(ids)))
+
+
+def _flushed_shows(session):
+    # the Show objects a flush inserts, moves or deletes
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, Show):
+            continue
+        if obj in session.dirty and not any(
+                inspect(obj).attrs[attr].history.has_changes()
+                for attr in ('venue_id', 'artist_id', 'start_time')):
+            continue
+        yield obj
+
+
+@event.listens_for(db.session, 'before_flush')
+def _shows_flushing(session, flush_context, instances):
+    # the venues/artists that moved and deleted shows belong to before the
+    # flush, read from the database: an attribute expired by a commit has
+    # no old value to compare with
+    stored = [inspect(obj).identity[0] for obj in _flushed_shows(session)
+              if inspect(obj).key]
+    if stored:
+        session.info.setdefault('shows_before_flush', set()).update(session.execute(
+            select(Show.venue_id, Show.artist_id).where(Show.id.in_(stored))))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _shows_flushed(session, flush_context):
+    # every venue/artist a flushed Show belongs (or belonged) to
+    before = session.info.pop('shows_before_flush', set())
+    after = {(obj.venue_id, obj.artist_id) for obj in _flushed_shows(session)
+             if obj not in session.deleted}
+    if before or after:
+        venue_ids, artist_ids = zip(*(before | after))
+        refresh_shows(venue_ids, artist_ids, connection=session.connection())
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _rolled_back(session, previous_transaction):
+    session.info.pop('shows_before_flush', None)
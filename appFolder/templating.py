@@ -0,0 +1,66 @@
+import os
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from appFolder import app, cache
+
+#----------------------------------------------------------------------------#
+# Template caching.
+#----------------------------------------------------------------------------#
+
+# Compiled templates are kept as bytecode in JINJA_BYTECODE_CACHE_DIR, so
+# a fresh worker loads them instead of parsing and compiling every
+# template again (`flask compile-templates` fills the directory at deploy
+# time).
+#
+# Expensive per-entity blocks are wrapped in
+#
+#   {% cache 'show-tile', show.id, show.updated_at %} ... {% endcache %}
+#
+# and their rendered HTML is reused for as long as the key is unchanged.
+# The key carries the entity's updated_at, so an edit makes a new key and
+# nothing needs invalidating. That also makes a per-process LRU safe with
+# several workers, and a cached fragment costs no more than a dict lookup.
+
+
+class FragmentCache(Extension):
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=cache.MemoryBackend(
+            app.config['FRAGMENT_CACHE_MAX_ENTRIES']))
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(parts)]),
+                               [], [], body).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        if not app.config['FRAGMENT_CACHE_ENABLED']:
+            return caller()
+        key = ':'.join(map(str, parts))
+        html = self.environment.fragment_cache.get(key)
+        if html is None:
+            html = caller()
+            self.environment.fragment_cache.set(key, html, app.config['FRAGMENT_CACHE_TTL'])
+        return Markup(html)
+
+
+def compile_templates():
+    # load every template once, writing the bytecode cache; returns how
+    # many there are
+    names = app.jinja_env.list_templates(extensions=['html'])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+if app.config['JINJA_BYTECODE_CACHE_DIR']:
+    os.makedirs(app.config['JINJA_BYTECODE_CACHE_DIR'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_BYTECODE_CACHE_DIR'])
+app.jinja_env.add_extension(FragmentCache)
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+#----------------------------------------------------------------------------#
+# View models.
+#----------------------------------------------------------------------------#
+
+# What the templates render, as __slots__ dataclasses built straight from
+# the query layer's column projections: no ORM objects and no per-row
+# dicts, so a row costs one small fixed-size object instead of a dict
+# repeating its keys (benchmarks/view_models.py measures the difference).
+# Templates read them by attribute exactly as they read the old dicts;
+# the JSON API turns them into dicts with dataclasses.asdict.
+
+
+#  Detail pages
+#  ----------------------------------------------------------------
+
+@dataclass
+class VenueShow:
+    # a show on a venue's page: who plays and when
+    __slots__ = ('artist_id', 'artist_name', 'artist_image_link', 'start_time')
+    artist_id: int
+    artist_name: str
+    artist_image_link: str
+    start_time: datetime
+
+
+@dataclass
+class ArtistShow:
+    # a show on an artist's page: where and when
+    __slots__ = ('venue_id', 'venue_name', 'venue_image_link', 'start_time')
+    venue_id: int
+    venue_name: str
+    venue_image_link: str
+    start_time: datetime
+
+
+@dataclass
+class VenueDetail:
+    __slots__ = ('id', 'name', 'genres', 'address', 'city', 'state', 'phone',
+                 'website', 'facebook_link', 'seeking_talent', 'seeking_description',
+                 'image_link', 'past_shows', 'upcoming_shows', 'past_shows_count',
+                 'upcoming_shows_count')
+    id: int
+    name: str
+    genres: list
+    address: str
+    city: str
+    state: object
+    phone: str
+    website: str
+    facebook_link: str
+    seeking_talent: bool
+    seeking_description: str
+    image_link: str
+    past_shows: list
+    upcoming_shows: list
+    past_shows_count: int
+    upcoming_shows_count: int
+
+
+@dataclass
+class ArtistDetail:
+    __slots__ = ('id', 'name', 'genres', 'city', 'state', 'phone', 'website',
+                 'facebook_link', 'seeking_venue', 'seeking_description',
+                 'image_link', 'past_shows', 'upcoming_shows', 'past_shows_count',
+                 'upcoming_shows_count')
+    id: int
+    name: str
+    genres: list
+    city: str
+    state: str
+    phone: str
+    website: str
+    facebook_link: str
+    seeking_venue: bool
+    seeking_description: str
+    image_link: str
+    past_shows: list
+    upcoming_shows: list
+    past_shows_count: int
+    upcoming_shows_count: int
+
+
+#  Listings
+#  ----------------------------------------------------------------
+
+@dataclass
+class ShowSummary:
+    # a tile on /shows
+    __slots__ = ('id', 'venue_id', 'venue_name', 'artist_id', 'artist_name',
+                 'artist_image_link', 'start_time', 'updated_at')
+    id: int
+    venue_id: int
+    venue_name: str
+    artist_id: int
+    artist_name: str
+    artist_image_link: str
+    start_time: datetime
+    updated_at: datetime
+
+
+@dataclass
+class VenueSummary:
+    # a venue under its area on /venues
+    __slots__ = ('id', 'name', 'num_upcoming_shows')
+    id: int
+    name: str
+    num_upcoming_shows: int
+
+
+@dataclass
+class ArtistSummary:
+    __slots__ = ('id', 'name')
+    id: int
+    name: str
+
+
+@dataclass
+class AreaGroup:
+    # the venues of one city on /venues
+    __slots__ = ('city', 'state', 'venues')
+    city: str
+    state: object
+    venues: list
@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+from sqlalchemy import or_, select, update as sql_update
+from appFolder import db
+
+#----------------------------------------------------------------------------#
+# Writes.
+#----------------------------------------------------------------------------#
+
+# Edits go through update(): one
+#
+#   UPDATE ... SET <columns>, version = version + 1
+#   WHERE id = :id AND version = :version
+#     AND (<any column IS DISTINCT FROM its new value>)
+#   RETURNING version
+#
+# with no SELECT before it. A submission that changes nothing matches no
+# row and writes nothing. Venue and Artist carry a version column that
+# every write bumps (the ORM does the same through version_id_col). The
+# edit form sends back the version it was rendered from, so when two
+# people edit the same row the second save is refused instead of
+# silently overwriting the first. Only when no row matched does a second
+# query tell "unchanged" from "gone" and "changed meanwhile".
+
+
+class NotFound(LookupError):
+    pass
+
+
+class Conflict(Exception):
+    # the row was changed by someone else since the form was loaded
+    pass
+
+
+@contextmanager
+def unit_of_work():
+    # one transaction: committed when the block succeeds, rolled back
+    # (and the error re-raised) when it doesn't
+    try:
+        yield db.session
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
+    finally:
+        db.session.close()
+
+
+def update(model, entity_id, values, version=None):
+    # write values to one row; returns its new version, or None when
+    # nothing changed. version, when given, is the one the client saw.
+    table = model.__table__
+    statement = sql_update(table) \
+        .where(table.c.id == entity_id) \
+        .where(or_(*[table.c[name].is_distinct_from(value) for name, value in values.items()])) \
+        .values(version=table.c.version + 1, **values)
+    if version is not None:
+        statement = statement.where(table.c.version == version)
+
+    if db.engine.dialect.full_returning:
+        row = db.session.execute(statement.returning(table.c.version)).first()
+        if row is not None:
+            return row.version
+    elif db.session.execute(statement).rowcount:
+        # SQLite stand-in: no UPDATE ... RETURNING in this SQLAlchemy
+        return db.session.execute(select(table.c.version).where(table.c.id == entity_id)).scalar()
+
+    current = db.session.execute(select(table.c.version).where(table.c.id == entity_id)).first()
+    if current is None:
+        raise NotFound(f'{model.__name__} {entity_id}')
+    if version is not None and current.version != version:
+        raise Conflict(f'{model.__name__} {entity_id} is at version {current.version}, not {version}')
+    return None
+
+
+#  Form values
+#  ----------------------------------------------------------------
+
+def venue_values(form):
+    return {
+        "name": form.name.data,
+        "city": form.city.data,
+        "state": form.state.data,
+        "address": form.address.data,
+        "phone": form.phone.data or '',
+        "image_link": form.image_link.data or '',
+        "genres": form.genres.data,
+        "facebook_link": form.facebook_link.data or '',
+        "website_link": form.website_link.data or '',
+        "seeking_talent": form.seeking_talent.data,
+        "seeking_decription": form.seeking_description.data or ''
+    }
+
+
+def artist_values(form):
+    return {
+        "name": form.name.data,
+        "city": form.city.data,
+        "state": form.state.data,
+        "phone": form.phone.data or '',
+        "image_link": form.image_link.data or '',
+        "genres": form.genres.data,
+        "facebook_link": form.facebook_link.data or '',
+        "website_link": form.website_link.data or '',
+        "seeking_venue": form.seeking_venue.data,
+        "seeking_description": form.seeking_description.data or ''
+    }
+
+
+def show_values(form):
+    return {
+        "artist_id": int(form.artist_id.data),
+        "venue_id": int(form.venue_id.data),
+        "start_time": form.start_time.data,
+        "duration": form.duration.data or form.duration.default
+    }
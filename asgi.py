@@ -0,0 +1,13 @@
+#----------------------------------------------------------------------------#
+# ASGI entry point (async serving mode).
+#----------------------------------------------------------------------------#
+
+# The same app with its read-heavy pages as async views, see
+# appFolder/aio.py. app.py remains the WSGI entry point.
+#
+#   uvicorn asgi:application --workers 4
+
+from app import app
+from appFolder import aio
+
+application = aio.AsgiApp(app)
@@ -0,0 +1,182 @@
+#----------------------------------------------------------------------------#
+# Sync vs async serving benchmark.
+#----------------------------------------------------------------------------#
+
+# Starts the app twice against DATABASE_URL, once as the WSGI app under
+# gunicorn and once as the ASGI app (asgi.py) under uvicorn, with the
+# same number of worker processes. Each server is then hit by --clients
+# concurrent keep-alive clients (500 by default) for --duration seconds.
+# The clients request the listings and detail pages the async mode
+# serves. The page cache is switched off, so every request reaches the
+# database. Prints throughput and p50/p99 per mode and writes a JSON
+# report.
+#
+#   DATABASE_URL=postgresql://... python -m benchmarks.async_serving --shows 100000
+#   python -m benchmarks.async_serving --sync-url http://host:8000 --async-url http://host:8001
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import time
+import urllib.parse
+import urllib.request
+from benchmarks.load import percentile, commit, REPORT_DIR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "sync": ['gunicorn', '--workers', '{workers}', '--threads', '{threads}',
+             '--bind', '127.0.0.1:{port}', '--log-level', 'warning', 'app:app'],
+    "async": ['uvicorn', '--workers', '{workers}', '--host', '127.0.0.1',
+              '--port', '{port}', '--log-level', 'warning', 'asgi:application']
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start(mode, workers, threads):
+    port = free_port()
+    command = [arg.format(workers=workers, threads=threads, port=port) for arg in SERVERS[mode]]
+    env = dict(os.environ, RESPONSE_CACHE_ENABLED='0')
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit(f'{mode} server did not start: {" ".join(command)}')
+
+
+#  Client
+#  ----------------------------------------------------------------
+
+async def _response(reader):
+    # (status, whether the server closes the connection, body) of one
+    # HTTP/1.1 response
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = dict(line.lower().split(': ', 1) for line in lines[1:] if ': ' in line)
+    if 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            body += await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        body = await reader.read()
+    return status, headers.get('connection') == 'close', body
+
+
+async def client(host, port, paths, deadline, rng, results):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        path = rng.choice(paths)
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+            status, closed, _ = await _response(reader)
+            if closed:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status, writer = None, None
+        results["latencies"].append(time.perf_counter() - started)
+        if status is None or status >= 500:
+            results["errors"] += 1
+    if writer is not None:
+        writer.close()
+
+
+def _paths(base_url):
+    # listings plus detail pages spread over the first ids
+    with urllib.request.urlopen(f'{base_url}/api/v1/venues?fields=id&limit=200') as r:
+        venues = [row['id'] for row in json.load(r)['data']]
+    with urllib.request.urlopen(f'{base_url}/api/v1/artists?fields=id&limit=200') as r:
+        artists = [row['id'] for row in json.load(r)['data']]
+    return ['/venues', '/artists', '/shows'] * 10 \
+        + [f'/venues/{id}' for id in venues] + [f'/artists/{id}' for id in artists]
+
+
+async def hammer(base_url, clients, duration, seed):
+    url = urllib.parse.urlsplit(base_url)
+    paths = _paths(base_url)
+    results = {"latencies": [], "errors": 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*[client(url.hostname, url.port or 80, paths, deadline,
+                                  random.Random(seed + i), results)
+                           for i in range(clients)])
+    latencies = sorted(results["latencies"])
+    return {
+        "requests": len(latencies),
+        "errors": results["errors"],
+        "requests_per_second": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8,
+                        help='threads per gunicorn worker in sync mode')
+    parser.add_argument('--shows', type=int, default=0,
+                        help='regenerate synthetic data with this many shows first')
+    parser.add_argument('--sync-url')
+    parser.add_argument('--async-url')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report')
+    args = parser.parse_args()
+
+    if args.shows:
+        from appFolder import app
+        from benchmarks import datagen
+        with app.app_context():
+            datagen.generate(args.shows)
+
+    report = {"commit": commit(), "clients": args.clients, "duration": args.duration,
+              "workers": args.workers, "threads": args.threads, "modes": {}}
+    for mode in ('sync', 'async'):
+        server, base_url = None, getattr(args, f'{mode}_url')
+        if not base_url:
+            server, base_url = start(mode, args.workers, args.threads)
+        try:
+            result = asyncio.run(hammer(base_url.rstrip('/'), args.clients,
+                                        args.duration, args.seed))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+        report["modes"][mode] = result
+        print(f'{mode:6} {result["requests_per_second"]:9.1f} req/s  '
+              f'p50 {result["p50_ms"]:8.1f}ms  p99 {result["p99_ms"]:8.1f}ms  '
+              f'{result["errors"]} errors')
+
+    path = args.report or os.path.join(REPORT_DIR, f'{report["commit"]}-serving.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'report written to {path}')
+
+
+if __name__ == '__main__':
+    main()
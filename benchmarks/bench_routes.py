@@ -0,0 +1,155 @@
+#----------------------------------------------------------------------------#
+# Route benchmarks.
+#----------------------------------------------------------------------------#
+
+# Every route in controller.py through the Flask test client, against
+# the data from benchmarks/datagen.py. Venue and artist 1 are the most
+# booked rows; the last ids are from the long tail. Write routes insert
+# or update a row in every round: each round books a new slot or saves
+# a new name.
+
+import random
+from datetime import datetime, timedelta
+from itertools import count
+import pytest
+from appFolder import db
+from appFolder.model import Venue, Artist
+from benchmarks import datagen
+
+
+def _form(row, booleans):
+    data = {k: v for k, v in row.items() if k not in booleans and k != 'seeking_decription'}
+    data.update({k: 'y' for k in booleans if row[k]})
+    data.setdefault('seeking_description', '')
+    return data
+
+
+@pytest.fixture(scope='module')
+def ids(app):
+    return {
+        "venue": 1,
+        "artist": 1,
+        "tail_venue": db.session.query(db.func.max(Venue.id)).scalar(),
+        "tail_artist": db.session.query(db.func.max(Artist.id)).scalar()
+    }
+
+
+@pytest.fixture
+def venue_form():
+    return _form(next(datagen.venue_rows(random.Random(1), 1)), ('seeking_talent',))
+
+
+@pytest.fixture
+def artist_form():
+    return _form(next(datagen.artist_rows(random.Random(1), 1)), ('seeking_venue',))
+
+
+#  Pages
+#  ----------------------------------------------------------------
+
+def bench_index(hit):
+    hit('GET', '/')
+
+
+def bench_venues(hit):
+    hit('GET', '/venues')
+
+
+def bench_artists(hit):
+    hit('GET', '/artists')
+
+
+def bench_shows(hit):
+    hit('GET', '/shows')
+
+
+def bench_show_venue(hit, ids):
+    hit('GET', f'/venues/{ids["venue"]}')
+
+
+def bench_show_venue_tail(hit, ids):
+    hit('GET', f'/venues/{ids["tail_venue"]}')
+
+
+def bench_show_artist(hit, ids):
+    hit('GET', f'/artists/{ids["artist"]}')
+
+
+def bench_show_artist_tail(hit, ids):
+    hit('GET', f'/artists/{ids["tail_artist"]}')
+
+
+def bench_search_venues(hit):
+    hit('POST', '/venues/search', data={'search_term': 'hop'})
+
+
+def bench_search_artists(hit):
+    hit('POST', '/artists/search', data={'search_term': 'band'})
+
+
+#  Forms
+#  ----------------------------------------------------------------
+
+def bench_create_venue_form(hit):
+    hit('GET', '/venues/create')
+
+
+def bench_create_artist_form(hit):
+    hit('GET', '/artists/create')
+
+
+def bench_create_show_form(hit):
+    hit('GET', '/shows/create')
+
+
+def bench_edit_venue_form(hit, ids):
+    hit('GET', f'/venues/{ids["venue"]}/edit')
+
+
+def bench_edit_artist_form(hit, ids):
+    hit('GET', f'/artists/{ids["artist"]}/edit')
+
+
+#  Writes
+#  ----------------------------------------------------------------
+
+def bench_create_venue(hit, venue_form):
+    hit('POST', '/venues/create', data=venue_form)
+
+
+def bench_create_artist(hit, artist_form):
+    hit('POST', '/artists/create', data=artist_form)
+
+
+def bench_create_show(write, ids):
+    # three hours apart, far beyond the generated shows
+    start = datetime(2090, 1, 1, 20)
+    write('/shows/create', lambda n: {
+        'artist_id': ids['tail_artist'], 'venue_id': ids['tail_venue'],
+        'start_time': f'{start + timedelta(hours=3 * n):%Y-%m-%d %H:%M:%S}'},
+        expect='Show was successfully listed!')
+
+
+def bench_edit_venue(write, ids, venue_form):
+    write(f'/venues/{ids["tail_venue"]}/edit',
+          lambda n: dict(venue_form, name=f'{venue_form["name"]} {n}'),
+          expect='was successfully updated!', lands_on=f'/venues/{ids["tail_venue"]}')
+
+
+def bench_edit_artist(write, ids, artist_form):
+    write(f'/artists/{ids["tail_artist"]}/edit',
+          lambda n: dict(artist_form, name=f'{artist_form["name"]} {n}'),
+          expect='was successfully updated!', lands_on=f'/artists/{ids["tail_artist"]}')
+
+
+def bench_delete_venue(benchmark, client):
+    # every round deletes a venue inserted just before it
+    names = count()
+
+    def setup():
+        row = dict(next(datagen.venue_rows(random.Random(), 1)), name=f'Doomed {next(names)}')
+        venue_id = db.session.execute(Venue.__table__.insert(), row).inserted_primary_key[0]
+        db.session.commit()
+        return (f'/venues/{venue_id}',), {}
+
+    benchmark.pedantic(lambda url: client.delete(url), setup=setup, rounds=50)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+from itertools import count
+
+# the SQLite stand-in unless DATABASE_URL names a scratch Postgres database
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(
+    tempfile.gettempdir(), 'fyyur-bench.db'))
+
+import pytest
+from appFolder import app as fyyur, db
+from appFolder import controller, api  # noqa: F401 (registers the routes)
+from appFolder.monitoring import max_queries
+from benchmarks import datagen
+
+BENCH_SHOWS = int(os.environ.get('BENCH_SHOWS', 10000))
+
+
+@pytest.fixture(scope='session')
+def app():
+    # cached pages would only measure the cache, so render every request
+    fyyur.config.update(RESPONSE_CACHE_ENABLED=False, WTF_CSRF_ENABLED=False,
+                        PROPAGATE_EXCEPTIONS=False,
+                        SLOW_REQUEST_MS=10 ** 9, SLOW_REQUEST_QUERIES=10 ** 9)
+    with fyyur.app_context():
+        datagen.generate(BENCH_SHOWS)
+        yield fyyur
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def hit(benchmark, client):
+    # benchmark one route; its status and query count go into the JSON
+    # report next to the timings. A route that does not answer 200 fails
+    # rather than being timed. Writes that redirect (post/redirect/get) name
+    # the page they must land on, and the redirect is followed.
+    def hit(method, url, lands_on=None, **kwargs):
+        if lands_on:
+            kwargs['follow_redirects'] = True
+        with max_queries(10 ** 9) as profile:
+            response = client.open(url, method=method, **kwargs)
+        benchmark.extra_info['status'] = response.status_code
+        benchmark.extra_info['queries'] = profile.count
+        assert response.status_code == 200, f'{method} {url}: {response.status}'
+        if lands_on:
+            assert response.request.path == lands_on, \
+                f'{method} {url}: landed on {response.request.path}'
+        return benchmark(client.open, url, method=method, **kwargs)
+    return hit
+
+
+@pytest.fixture
+def write(benchmark, client):
+    # benchmark a POST that has to take effect in every round: form(n)
+    # builds round n's form data, and every response must land on
+    # lands_on (following the redirect) and contain `expect`, so a round
+    # that hits a validation error, a conflict or a no-op fails
+    def write(url, form, expect, lands_on=None, rounds=50):
+        numbers, responses = count(), []
+
+        def setup():
+            return (form(next(numbers)),), {}
+
+        def post(data):
+            responses.append(client.post(url, data=data, follow_redirects=bool(lands_on)))
+
+        benchmark.pedantic(post, setup=setup, rounds=rounds)
+        benchmark.extra_info['status'] = responses[-1].status_code
+        for response in responses:
+            assert response.status_code == 200, f'POST {url}: {response.status}'
+            if lands_on:
+                assert response.request.path == lands_on, \
+                    f'POST {url}: landed on {response.request.path}'
+            assert expect in response.get_data(as_text=True), f'POST {url}: no {expect!r}'
+    return write
@@ -0,0 +1,176 @@
+#----------------------------------------------------------------------------#
+# Synthetic data generator.
+#----------------------------------------------------------------------------#
+
+# Fills the configured database with venues, artists and shows. Sizes
+# scale with --shows (1k to 1M): one venue per ~100 shows and one artist
+# per ~25. Cities and genres follow a long-tailed distribution, so a few
+# big cities and popular genres hold most of the rows, as they do in real
+# listings. Bookings are skewed the same way, so a handful of venues and
+# artists have thousands of shows while most have a few. No venue or
+# artist is double-booked (see appFolder/scheduling.py), so the busiest
+# ones get as many shows as their calendar holds.
+#
+# The tables are dropped and recreated, so point DATABASE_URL at a
+# scratch database. An sqlite:/// URL works as a local stand-in (see
+# appFolder/dialects.py).
+#
+#   DATABASE_URL=sqlite:////tmp/fyyur-bench.db python -m benchmarks.datagen --shows 100000
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from appFolder import app, db, stats, scheduling
+from appFolder.forms import ArtistForm
+from appFolder.model import Venue, Artist, Show
+
+BATCH_SIZE = 10000
+
+# (city, state), most populous first
+CITIES = [
+    ('New York', 'NY'), ('Los Angeles', 'CA'), ('Chicago', 'IL'),
+    ('Houston', 'TX'), ('Phoenix', 'AZ'), ('Philadelphia', 'PA'),
+    ('San Antonio', 'TX'), ('San Diego', 'CA'), ('Dallas', 'TX'),
+    ('San Francisco', 'CA'), ('Austin', 'TX'), ('Seattle', 'WA'),
+    ('Denver', 'CO'), ('Nashville', 'TN'), ('Boston', 'MA'),
+    ('Portland', 'OR'), ('Las Vegas', 'NV'), ('Detroit', 'MI'),
+    ('Atlanta', 'GA'), ('Miami', 'FL'), ('Minneapolis', 'MN'),
+    ('New Orleans', 'LA'), ('Cleveland', 'OH'), ('Kansas City', 'MO'),
+    ('Memphis', 'TN'), ('Baltimore', 'MD'), ('Pittsburgh', 'PA'),
+    ('Salt Lake City', 'UT'), ('Albuquerque', 'NM'), ('Boise', 'ID'),
+]
+
+# the form's genre choices, in the order the zipf weights are applied
+GENRES = [value for value, _ in ArtistForm.genres.kwargs['choices']]
+
+WORDS = ['Hop', 'Live', 'Hall', 'Room', 'Garden', 'Lounge', 'Club', 'Sax',
+         'Petals', 'Band', 'Echo', 'Blue', 'Velvet', 'Static', 'Harbor']
+
+
+def zipf_weights(n, s=1.1):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def _genres(rng, weights):
+    return sorted(set(rng.choices(GENRES, weights, k=rng.randint(1, 3))))
+
+
+def _people(rng, count, kind):
+    # shared columns of venue and artist rows
+    city_weights = zipf_weights(len(CITIES))
+    genre_weights = zipf_weights(len(GENRES), 0.8)
+    for i in range(1, count + 1):
+        city, state = rng.choices(CITIES, city_weights)[0]
+        name = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {kind} {i}'
+        yield {
+            "name": name,
+            "city": city,
+            "state": state,
+            "phone": f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            "image_link": f'https://example.com/{kind.lower()}/{i}.png',
+            "genres": _genres(rng, genre_weights),
+            "facebook_link": f'https://www.facebook.com/{kind.lower()}{i}',
+            "website_link": f'https://{kind.lower()}{i}.example.com',
+        }
+
+
+def venue_rows(rng, count):
+    for row in _people(rng, count, 'Venue'):
+        row.update({
+            "address": f'{rng.randint(1, 9999)} {rng.choice(WORDS)} St',
+            "seeking_talent": rng.random() < 0.3,
+            "seeking_decription": ''
+        })
+        yield row
+
+
+def artist_rows(rng, count):
+    for row in _people(rng, count, 'Artist'):
+        row.update({
+            "seeking_venue": rng.random() < 0.4,
+            "seeking_description": ''
+        })
+        yield row
+
+
+def show_rows(rng, count, venues, artists, now):
+    # a year either side of now, mostly on weekend evenings
+    venue_weights = zipf_weights(venues, 0.9)
+    artist_weights = zipf_weights(artists, 0.9)
+    venue_ids = range(1, venues + 1)
+    artist_ids = range(1, artists + 1)
+    for _ in range(count):
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0) \
+            + timedelta(days=rng.randint(-365, 365))
+        if rng.random() < 0.6:
+            day += timedelta(days=(4 - day.weekday()) % 7 + rng.choice([0, 1]))
+        yield {
+            "venue_id": rng.choices(venue_ids, venue_weights)[0],
+            "artist_id": rng.choices(artist_ids, artist_weights)[0],
+            "start_time": day + timedelta(hours=rng.choice([19, 20, 20, 21, 22]),
+                                          minutes=rng.choice([0, 0, 30])),
+            "duration": rng.choice([60, 90, 120, 120, 180])
+        }
+
+
+def booked_show_rows(rng, count, venues, artists, now, rounds=10):
+    # show_rows without double bookings: draws more until count shows fit
+    # (or rounds run out, for calendars too full to take them all)
+    rows = []
+    for _ in range(rounds):
+        missing = count - len(rows)
+        if missing <= 0:
+            break
+        rows += show_rows(rng, missing * 2, venues, artists, now)
+        found = scheduling.overlapping(rows)
+        rows = [row for position, row in enumerate(rows) if position not in found]
+    return rows[:count]
+
+
+def _insert(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.session.execute(model.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(model.__table__.insert(), batch)
+
+
+def generate(shows=10000, seed=0, venues=None, artists=None):
+    # recreates the tables and returns the row counts; call inside an app
+    # context
+    rng = random.Random(seed)
+    venues = venues or max(10, shows // 100)
+    artists = artists or max(20, shows // 25)
+
+    db.drop_all()
+    db.create_all()
+    _insert(Venue, venue_rows(rng, venues))
+    _insert(Artist, artist_rows(rng, artists))
+    shows = booked_show_rows(rng, shows, venues, artists, datetime.now())
+    _insert(Show, shows)
+    db.session.commit()
+    stats.rebuild()
+    return {"venues": venues, "artists": artists, "shows": len(shows)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--venues', type=int)
+    parser.add_argument('--artists', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with app.app_context():
+        counts = generate(args.shows, args.seed, args.venues, args.artists)
+    print(', '.join(f'{n} {table}' for table, n in counts.items()),
+          f'in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
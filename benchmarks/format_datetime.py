@@ -0,0 +1,74 @@
+#----------------------------------------------------------------------------#
+# format_datetime benchmark.
+#----------------------------------------------------------------------------#
+
+# Renders pages/shows.html with 10k synthetic shows (no database needed)
+# once with the old str -> dateutil -> babel filter and once with the
+# current one, and prints the per-row cost of each. The show tile
+# fragment cache is off, so every row runs the filter.
+#
+#   python -m benchmarks.format_datetime [--shows N] [--repeat N]
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from flask import render_template
+import babel.dates
+import dateutil.parser
+from appFolder import app, controller
+
+
+def legacy_format_datetime(value, format='medium'):
+    date = dateutil.parser.parse(str(value))
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale='en')
+
+
+def make_shows(n):
+    random.seed(0)
+    start = datetime(2026, 1, 1, 20, 0)
+    return [{
+        "venue_id": i % 500,
+        "venue_name": f"Venue {i % 500}",
+        "artist_id": i % 2000,
+        "artist_name": f"Artist {i % 2000}",
+        "artist_image_link": "https://example.com/a.png",
+        # shows cluster on a few hundred evenings, as real listings do
+        "start_time": start + timedelta(days=random.randint(0, 365), hours=random.choice([0, 1, 2]))
+    } for i in range(n)]
+
+
+def render(shows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        with app.test_request_context('/shows'):
+            started = time.perf_counter()
+            render_template('pages/shows.html', shows=shows, page={})
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    app.config['FRAGMENT_CACHE_ENABLED'] = False
+    shows = make_shows(args.shows)
+
+    for name, fn in (('legacy', legacy_format_datetime),
+                     ('current', controller.format_datetime)):
+        app.jinja_env.filters['datetime'] = fn
+        controller._format_datetime.cache_clear()
+        seconds = render(shows, args.repeat)
+        print(f'{name:8} {seconds * 1000:9.1f} ms/page '
+              f'{seconds / args.shows * 1e6:7.2f} us/row')
+    app.jinja_env.filters['datetime'] = controller.format_datetime
+
+
+if __name__ == '__main__':
+    main()
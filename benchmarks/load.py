@@ -0,0 +1,243 @@
+#----------------------------------------------------------------------------#
+# Load test.
+#----------------------------------------------------------------------------#
+
+# A small locust-style load generator: --users threads each loop over a
+# weighted mix of tasks (mostly listing and detail pages, some searches,
+# a few show bookings) for --duration seconds. Queries per request come
+# from the Server-Timing header. Without --url the app is served
+# in-process against DATABASE_URL, after optionally filling it with
+# --shows rows of synthetic data (benchmarks/datagen.py).
+#
+# The JSON report (benchmarks/reports/<commit>.json by default) holds
+# p50/p95/p99 latency, error counts and queries per request for each
+# task. --baseline compares with an earlier report and exits non-zero
+# when a task's p99 or query count grew by more than --tolerance.
+#
+#   DATABASE_URL=sqlite:////tmp/fyyur-bench.db python -m benchmarks.load --shows 10000
+#   python -m benchmarks.load --url http://localhost:5000 --baseline benchmarks/reports/abc1234.json
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+REPORT_DIR = os.path.join(os.path.dirname(__file__), 'reports')
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(values, p):
+    # nearest rank on sorted values
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, round(p / 100 * len(values) + 0.5) - 1))
+    return values[rank]
+
+
+#  Tasks
+#  ----------------------------------------------------------------
+
+# (weight, name, request) where request(ids, rng) -> (method, path, form)
+TASKS = [
+    (20, 'venues', lambda ids, rng: ('GET', '/venues', None)),
+    (20, 'artists', lambda ids, rng: ('GET', '/artists', None)),
+    (15, 'shows', lambda ids, rng: ('GET', '/shows', None)),
+    (15, 'show_venue', lambda ids, rng: ('GET', f'/venues/{rng.choice(ids["venues"])}', None)),
+    (15, 'show_artist', lambda ids, rng: ('GET', f'/artists/{rng.choice(ids["artists"])}', None)),
+    (5, 'search_venues', lambda ids, rng: ('POST', '/venues/search',
+                                           {'search_term': rng.choice(['hop', 'live', 'club'])})),
+    (5, 'search_artists', lambda ids, rng: ('POST', '/artists/search',
+                                            {'search_term': rng.choice(['band', 'sax', 'echo'])})),
+    (3, 'home', lambda ids, rng: ('GET', '/', None)),
+    (2, 'create_show', lambda ids, rng: ('POST', '/shows/create', {
+        'artist_id': rng.choice(ids["artists"]),
+        'venue_id': rng.choice(ids["venues"]),
+        'start_time': (datetime.now() + timedelta(days=rng.randint(1, 365))).strftime('%Y-%m-%d 20:00:00')
+    })),
+]
+
+
+def _ids(base_url, resource):
+    # ids to spread detail requests over, from the JSON API
+    url = f'{base_url}/api/v1/{resource}?fields=id&limit=200'
+    with urllib.request.urlopen(url) as response:
+        return [row['id'] for row in json.load(response)['data']]
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # a form post answers with a redirect; time the post, not the page after
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def user(base_url, ids, deadline, seed, results, lock):
+    rng = random.Random(seed)
+    opener = urllib.request.build_opener(NoRedirect)
+    weights = [weight for weight, _, _ in TASKS]
+    while time.monotonic() < deadline:
+        _, name, make = rng.choices(TASKS, weights)[0]
+        method, path, form = make(ids, rng)
+        data = urllib.parse.urlencode(form).encode() if form else None
+        request = urllib.request.Request(base_url + path, data=data, method=method)
+
+        started = time.perf_counter()
+        try:
+            response = opener.open(request)
+            response.read()
+            status, headers = response.status, response.headers
+        except urllib.error.HTTPError as e:
+            status, headers = e.code, e.headers
+        except OSError:
+            status, headers = None, {}
+        elapsed = time.perf_counter() - started
+
+        match = SERVER_TIMING_QUERIES.search(headers.get('Server-Timing', ''))
+        with lock:
+            stats = results.setdefault(name, {"latencies": [], "queries": [], "errors": 0})
+            stats["latencies"].append(elapsed)
+            if match:
+                stats["queries"].append(int(match.group(1)))
+            if status is None or status >= 500:
+                stats["errors"] += 1
+
+
+def summarize(samples):
+    latencies = sorted(samples["latencies"])
+    queries = samples["queries"]
+    return {
+        "requests": len(latencies),
+        "errors": samples["errors"],
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None
+    }
+
+
+def run(base_url, users, duration, seed=0):
+    ids = {"venues": _ids(base_url, 'venues'), "artists": _ids(base_url, 'artists')}
+    results, lock = {}, threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=user, args=(base_url, ids, deadline, seed + i, results, lock))
+               for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    everything = {"latencies": [], "queries": [], "errors": 0}
+    for samples in results.values():
+        everything["latencies"] += samples["latencies"]
+        everything["queries"] += samples["queries"]
+        everything["errors"] += samples["errors"]
+    total = summarize(everything)
+    total["requests_per_second"] = round(total["requests"] / duration, 1)
+    return {"tasks": {name: summarize(s) for name, s in sorted(results.items())},
+            "total": total}
+
+
+#  Server and report
+#  ----------------------------------------------------------------
+
+def serve(shows):
+    # the app on a free local port in a background thread
+    from werkzeug.serving import make_server
+    # the routes, and monitoring for the Server-Timing header
+    from appFolder import app, controller, api, monitoring  # noqa: F401
+    if shows:
+        from benchmarks import datagen
+        with app.app_context():
+            datagen.generate(shows)
+    app.config.update(WTF_CSRF_ENABLED=False, SLOW_REQUEST_MS=10 ** 9,
+                      SLOW_REQUEST_QUERIES=10 ** 9)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}', app.config['SQLALCHEMY_DATABASE_URI']
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(report, baseline, tolerance):
+    # lines describing tasks that got slower or chattier than the baseline
+    regressions = []
+    for name, now in report["tasks"].items():
+        before = baseline["tasks"].get(name)
+        if not before:
+            continue
+        for key in ('p99_ms', 'queries_per_request'):
+            if before[key] and now[key] and now[key] > before[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {before[key]} -> {now[key]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='target a running server instead of serving in-process')
+    parser.add_argument('--shows', type=int, default=0,
+                        help='regenerate synthetic data with this many shows first')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    server, database = None, None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        server, base_url, database = serve(args.shows)
+    try:
+        results = run(base_url, args.users, args.duration, args.seed)
+    finally:
+        if server:
+            server.shutdown()
+
+    report = {
+        "commit": commit(),
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "target": args.url or database,
+        "users": args.users,
+        "duration": args.duration,
+        **results
+    }
+    path = args.report or os.path.join(REPORT_DIR, f'{report["commit"]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in report["tasks"].items():
+        print(f'{name:16} {stats["requests"]:7} req  p50 {stats["p50_ms"]:8.1f}ms  '
+              f'p99 {stats["p99_ms"]:8.1f}ms  {stats["queries_per_request"]} q/req  '
+              f'{stats["errors"]} errors')
+    print(f'report written to {path}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print('REGRESSION ' + line)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#----------------------------------------------------------------------------#
+# Page weight benchmark.
+#----------------------------------------------------------------------------#
+
+# Fetches the home page through the test client, then every local
+# stylesheet and script it links. This is done once with the separate
+# source files and once with the bundles from `flask build-assets` (run
+# it first). Reports the request count and bytes on the wire with and
+# without compression. The IE-only and jQuery fallback scripts are left
+# out, since browsers normally don't load them.
+#
+#   flask build-assets && python -m benchmarks.page_weight
+
+import re
+from app import app
+
+ASSET = re.compile(r'(?:href|src)="(/static/[^"]+\.(?:css|js))"')
+# conditional comments and inline scripts (the jQuery fallback)
+SKIPPED = re.compile(r'<!--.*?-->|<script>.*?</script>', re.S)
+
+
+def weight(client, encoding):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    page = client.get('/', headers=headers)
+    html = client.get('/').get_data(as_text=True)
+    urls = sorted(set(ASSET.findall(SKIPPED.sub('', html))))
+    total = len(page.data)
+    for url in urls:
+        response = client.get(url, headers=headers)
+        total += len(response.data)
+        response.close()
+    return 1 + len(urls), total
+
+
+def main():
+    client = app.test_client()
+    print(f'{"":10} {"requests":>8} {"identity":>10} {"gzip":>10} {"br":>10}')
+    for bundles in (False, True):
+        app.config['ASSET_BUNDLES'] = bundles
+        sizes = [weight(client, encoding) for encoding in (None, 'gzip', 'br')]
+        print(f'{"bundled" if bundles else "separate":10} {sizes[0][0]:8} '
+              + ' '.join(f'{size:10}' for _, size in sizes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#----------------------------------------------------------------------------#
+# Template caching benchmark.
+#----------------------------------------------------------------------------#
+
+# Cold start: starts fresh interpreters that import the app and request
+# the pages that need no database (home and the three forms). It reports
+# the import time, the time to the first response, and the time until
+# every page has been served. Three variants run: without the bytecode
+# cache, with an empty one (the first deploy), and with one filled by
+# `flask compile-templates`.
+#
+# Steady state: renders pages/shows.html for a page of synthetic shows
+# with the fragment cache off and on (warm), no database needed.
+#
+#   python -m benchmarks.templates [--runs N] [--renders N] [--shows N]
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ['/', '/venues/create', '/artists/create', '/shows/create']
+
+CHILD = f'''
+import json, time
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+client = app.test_client()
+first = None
+for path in {PATHS!r}:
+    client.get(path)
+    first = first or time.perf_counter()
+print(json.dumps([imported - started, first - imported, time.perf_counter() - imported]))
+'''
+
+
+def cold_start(cache_dir, runs, empty=False):
+    # median (import, first response, all pages) in seconds; empty clears
+    # the cache directory before every run
+    samples = []
+    env = dict(os.environ, JINJA_BYTECODE_CACHE_DIR=cache_dir)
+    for _ in range(runs):
+        if empty:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        out = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env,
+                             check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(out.splitlines()[-1]))
+    return [statistics.median(column) for column in zip(*samples)]
+
+
+def steady_state(shows, renders):
+    # best per-render seconds of pages/shows.html without and with the
+    # fragment cache
+    from flask import render_template
+    from appFolder import app, controller
+    from appFolder.viewmodels import ShowSummary
+
+    start = datetime(2026, 1, 1, 20, 0)
+    page = [ShowSummary(i, i % 50, f'Venue {i % 50}', i % 200, f'Artist {i % 200}',
+                        'https://example.com/a.png', start + timedelta(hours=i), start)
+            for i in range(shows)]
+    results = {}
+    for enabled in (False, True):
+        app.config['FRAGMENT_CACHE_ENABLED'] = enabled
+        best = float('inf')
+        with app.test_request_context('/shows'):
+            render_template('pages/shows.html', shows=page, page={})
+            for _ in range(renders):
+                controller._format_datetime.cache_clear()
+                started = time.perf_counter()
+                render_template('pages/shows.html', shows=page, page={})
+                best = min(best, time.perf_counter() - started)
+        results[enabled] = best
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--renders', type=int, default=200)
+    parser.add_argument('--shows', type=int, default=50,
+                        help='shows per rendered page (LISTING_PAGE_SIZE)')
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='fyyur-jinja-')
+    # the empty-cache runs leave it filled, as compile-templates would
+    variants = [('no bytecode cache', '', False), ('empty cache', cache_dir, True),
+                ('compiled cache', cache_dir, False)]
+    print('cold start (median)        import   first byte   all pages')
+    try:
+        for name, directory, empty in variants:
+            imported, first, total = cold_start(directory, args.runs, empty)
+            print(f'{name:24} {imported * 1000:8.1f}ms {first * 1000:10.1f}ms '
+                  f'{total * 1000:9.1f}ms')
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    results = steady_state(args.shows, args.renders)
+    print(f'\nsteady state, {args.shows} shows per page')
+    for enabled, seconds in results.items():
+        print(f'fragment cache {"on " if enabled else "off"}  {seconds * 1e6:9.1f} us/render')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#----------------------------------------------------------------------------#
+# View model benchmark.
+#----------------------------------------------------------------------------#
+
+# Builds and renders pages/shows.html and pages/venues.html from N
+# synthetic rows (no database needed), once from per-row dicts as the
+# views used to and once from the __slots__ view models. Each variant
+# runs in a fresh process, which reports the memory its page objects
+# take, the growth in peak RSS while they are built and rendered, and
+# the best render time.
+#
+#   python -m benchmarks.view_models [--rows N] [--repeat N]
+
+import argparse
+import multiprocessing
+import random
+import resource
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from itertools import groupby
+from flask import render_template
+from appFolder import app, controller, queries
+from appFolder.viewmodels import ShowSummary
+
+
+def show_rows(n):
+    # (id, venue_id, venue_name, artist_id, artist_name, artist_image_link,
+    # start_time, updated_at), the columns of queries.show_rows()
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1, 20, 0)
+    return [(i, i % 500, f'Venue {i % 500}', i % 2000, f'Artist {i % 2000}',
+             f'https://example.com/artist/{i % 2000}.png',
+             start + timedelta(days=rng.randint(0, 365)), start)
+            for i in range(n)]
+
+
+def venue_rows(n):
+    # (id, name, city, state, num_upcoming_shows) in city/state order
+    return sorted(((i, f'Venue {i}', f'City {i % 300}', 'CA', i % 7) for i in range(n)),
+                  key=lambda row: row[2])
+
+
+def dict_shows(rows):
+    return [{
+        "id": id,
+        "venue_id": venue_id,
+        "venue_name": venue_name,
+        "artist_id": artist_id,
+        "artist_name": artist_name,
+        "artist_image_link": artist_image_link,
+        "start_time": start_time,
+        "updated_at": updated_at
+    } for id, venue_id, venue_name, artist_id, artist_name, artist_image_link, start_time,
+        updated_at in rows]
+
+
+def dict_areas(rows):
+    return [{
+        "city": city,
+        "state": state,
+        "venues": [{"id": v[0], "name": v[1], "num_upcoming_shows": v[4]} for v in venues]
+    } for (city, state), venues in groupby(rows, key=lambda r: (r[2], r[3]))]
+
+
+class VenueRow(tuple):
+    # attribute access like a SQLAlchemy Row, as group_areas expects
+    id = property(lambda self: self[0])
+    name = property(lambda self: self[1])
+    city = property(lambda self: self[2])
+    state = property(lambda self: self[3])
+    num_upcoming_shows = property(lambda self: self[4])
+
+
+VARIANTS = {
+    "dicts": (dict_shows, dict_areas),
+    "view models": (lambda rows: queries.summaries(rows, ShowSummary),
+                    lambda rows: queries.group_areas(map(VenueRow, rows)))
+}
+
+
+def _max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(variant, n, repeat, results):
+    build_shows, build_areas = VARIANTS[variant]
+    app.config['FRAGMENT_CACHE_ENABLED'] = False
+    shows, venues = show_rows(n), venue_rows(n)
+    rss_before = _max_rss_kb()
+
+    tracemalloc.start()
+    page_shows, page_areas = build_shows(shows), build_areas(venues)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    best = float('inf')
+    for _ in range(repeat):
+        controller._format_datetime.cache_clear()
+        with app.test_request_context('/shows'):
+            started = time.perf_counter()
+            render_template('pages/shows.html', shows=page_shows, page={})
+            render_template('pages/venues.html', areas=page_areas, page={})
+            best = min(best, time.perf_counter() - started)
+    results[variant] = (size, _max_rss_kb() - rss_before, best)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = multiprocessing.Manager().dict()
+    for variant in VARIANTS:
+        process = multiprocessing.Process(target=measure,
+                                          args=(variant, args.rows, args.repeat, results))
+        process.start()
+        process.join()
+
+    for variant, (size, rss_kb, seconds) in results.items():
+        print(f'{variant:12} objects {size / 2**20:7.1f} MiB  '
+              f'peak rss +{rss_kb / 1024:7.1f} MiB  render {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#----------------------------------------------------------------------------#
+# EXPLAIN check.
+#----------------------------------------------------------------------------#
+
+# Loads a large synthetic fixture into the configured Postgres database
+# (inside a transaction that is rolled back), runs every query the
+# controllers issue, EXPLAINs each captured statement and exits non-zero
+# if any plan contains a sequential scan on Venue, Artist or Show.
+#
+#   python explain_check.py [--venues N] [--artists N] [--shows N]
+
+import argparse
+import hashlib
+import json
+import sys
+from sqlalchemy import event, text
+from appFolder import app, db, queries, stats
+from appFolder.model import Venue, Artist
+
+TABLES = {'Venue', 'Artist', 'Show'}
+
+# venues, artists and their shows in one statement, so the shows only
+# book the fixture's own rows. Names carry an md5 so that their trigrams
+# are as varied as real ones. Every show gets its own 10 minute slot,
+# so none of them double-books a venue or artist (see the exclusion
+# constraints on Show); half are in the past, half upcoming.
+FIXTURE = [
+    '''
+    WITH v AS (
+        INSERT INTO "Venue" (name, city, state, address, phone, image_link, genres,
+                             facebook_link, website_link, seeking_talent,
+                             seeking_decription)
+        SELECT 'Venue ' || substr(md5(g::text), 1, 12), 'City ' || (g % 200),
+               (ARRAY['CA', 'NY', 'TX', 'WA', 'IL'])[1 + g % 5]::state,
+               g || ' Main St', '555-0100', 'https://example.com/v.png', '{}',
+               'https://facebook.com/v', 'https://example.com', g % 3 = 0, ''
+        FROM generate_series(1, :venues) AS g
+        RETURNING id
+    ), a AS (
+        INSERT INTO "Artist" (name, city, state, phone, image_link, genres,
+                              facebook_link, website_link, seeking_venue,
+                              seeking_description)
+        SELECT 'Artist ' || substr(md5(g::text), 1, 12), 'City ' || (g % 200),
+               (ARRAY['CA', 'NY', 'TX', 'WA', 'IL'])[1 + g % 5],
+               '555-0100', 'https://example.com/a.png', '{}',
+               'https://facebook.com/a', 'https://example.com', g % 2 = 0, ''
+        FROM generate_series(1, :artists) AS g
+        RETURNING id
+    ), venue_ids AS (SELECT array_agg(id) AS ids FROM v),
+       artist_ids AS (SELECT array_agg(id) AS ids FROM a)
+    INSERT INTO "Show" (artist_id, venue_id, start_time, duration)
+    SELECT artist_ids.ids[1 + g % cardinality(artist_ids.ids)],
+           venue_ids.ids[1 + (g * 7) % cardinality(venue_ids.ids)],
+           localtimestamp + (g - :shows / 2) * interval '10 minutes',
+           10
+    FROM generate_series(1, :shows) AS g, venue_ids, artist_ids
+    ''',
+    # move the fresh rows out of the GIN pending lists (as autovacuum
+    # would), which the planner otherwise prices as a full scan
+    '''
+    SELECT gin_clean_pending_list(index)
+    FROM unnest(ARRAY['ix_venue_name_trgm', 'ix_venue_city_trgm',
+                      'ix_artist_name_trgm', 'ix_artist_city_trgm']::regclass[]) AS index
+    ''',
+    'ANALYZE "Venue"',
+    'ANALYZE "Artist"',
+    'ANALYZE "Show"',
+]
+
+
+def _name_part(g):
+    # a search term taken from the name of the fixture's g-th venue/artist
+    return hashlib.md5(str(g).encode()).hexdigest()[:8]
+
+
+def _in_request(version, *args):
+    # the listing versions read the page's cursor from the request
+    def run():
+        with app.test_request_context():
+            return version(*args).all()
+    return run
+
+
+def controller_queries():
+    # the query layer calls behind every read view
+    venue_id = db.session.query(Venue.id).limit(1).scalar()
+    artist_id = db.session.query(Artist.id).limit(1).scalar()
+    yield 'venues', lambda: queries.venue_areas()
+    yield 'artists', lambda: queries.artist_listing()
+    yield 'shows', lambda: queries.show_listing()
+    yield 'search_venues', lambda: queries.search_results(Venue, _name_part(4321))
+    yield 'search_artists', lambda: queries.search_results(Artist, _name_part(14321))
+    yield 'show_venue', lambda: queries.timeline_rows(Venue, venue_id)
+    yield 'show_artist', lambda: queries.timeline_rows(Artist, artist_id)
+    # the ETag/Last-Modified queries that run before each page
+    yield 'venues_version', _in_request(queries.venues_version)
+    yield 'artists_version', _in_request(queries.artists_version)
+    yield 'shows_version', _in_request(queries.shows_version)
+    yield 'venue_version', _in_request(queries.venue_version, venue_id)
+    yield 'artist_version', _in_request(queries.artist_version, artist_id)
+
+
+def seq_scans(plan):
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in TABLES:
+        yield plan['Relation Name']
+    for child in plan.get('Plans', []):
+        yield from seq_scans(child)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--venues', type=int, default=5000)
+    parser.add_argument('--artists', type=int, default=20000)
+    parser.add_argument('--shows', type=int, default=500000)
+    args = parser.parse_args()
+
+    failed = False
+    with app.app_context():
+        conn = db.session.connection()
+        try:
+            # loading the fixture takes longer than a request may
+            conn.execute(text('SET LOCAL statement_timeout = 0'))
+            for statement in FIXTURE:
+                conn.execute(text(statement), vars(args))
+            # listings read the precomputed show counts
+            for model in stats.STATS:
+                stats.refresh(model)
+            conn.execute(text('ANALYZE "VenueStats"'))
+            conn.execute(text('ANALYZE "ArtistStats"'))
+
+            for name, run in controller_queries():
+                captured = []
+
+                def capture(conn, cursor, statement, parameters, context, executemany):
+                    captured.append((statement, parameters))
+
+                event.listen(db.engine, 'before_cursor_execute', capture)
+                try:
+                    run()
+                finally:
+                    event.remove(db.engine, 'before_cursor_execute', capture)
+
+                for statement, parameters in captured:
+                    plan = conn.exec_driver_sql(
+                        'EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    scanned = sorted(set(seq_scans(plan[0]['Plan'])))
+                    status = 'SEQ SCAN on ' + ', '.join(scanned) if scanned else 'ok'
+                    print(f'{name:16} {status}')
+                    if scanned:
+                        failed = True
+                        print('    ' + ' '.join(statement.split()))
+        finally:
+            db.session.rollback()
+            db.session.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
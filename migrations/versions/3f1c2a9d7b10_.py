@@ -0,0 +1,35 @@
+"""trigram search indexes on Venue and Artist
+
+Revision ID: 3f1c2a9d7b10
+Revises: 9e2b7d4c1a53
+Create Date: 2026-10-18 10:02:11.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = '9e2b7d4c1a53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # gin_trgm_ops lets ILIKE '%term%' and similarity() use an index
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('Venue', 'Artist'):
+        for column in ('name', 'city'):
+            op.create_index(f'ix_{table.lower()}_{column}_trgm', table, [column],
+                            postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'})
+        # state is a two letter code, matched by equality
+        op.create_index(f'ix_{table.lower()}_state', table, ['state'])
+
+
+def downgrade():
+    for table in ('Venue', 'Artist'):
+        op.drop_index(f'ix_{table.lower()}_state', table_name=table)
+        for column in ('name', 'city'):
+            op.drop_index(f'ix_{table.lower()}_{column}_trgm', table_name=table)
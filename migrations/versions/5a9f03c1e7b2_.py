@@ -0,0 +1,29 @@
+"""updated_at on Venue, Artist and Show
+
+Revision ID: 5a9f03c1e7b2
+Revises: c27a51e9d4f8
+Create Date: 2026-10-18 14:05:44.910382
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9f03c1e7b2'
+down_revision = 'c27a51e9d4f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist', 'Show'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.text("(now() at time zone 'utc')")))
+        op.create_index(op.f(f'ix_{table}_updated_at'), table, ['updated_at'])
+
+
+def downgrade():
+    for table in ('Show', 'Artist', 'Venue'):
+        op.drop_index(op.f(f'ix_{table}_updated_at'), table_name=table)
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,37 @@
+"""Show duration and no-double-booking exclusion constraints
+
+Revision ID: 7c3e5b9d2a48
+Revises: e4a7c91b3f26
+Create Date: 2026-10-18 22:14:07.318502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5b9d2a48'
+down_revision = 'e4a7c91b3f26'
+branch_labels = None
+depends_on = None
+
+PERIOD = "tsrange(start_time, start_time + duration * interval '1 minute')"
+
+
+def upgrade():
+    op.add_column('Show', sa.Column('duration', sa.Integer(), nullable=False,
+                                    server_default='120'))
+    # gist support for the plain integer ids
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    # fails, naming the first pair it finds, while existing shows still
+    # double-book a venue or artist; move or shorten them and rerun
+    for name, column in (('ex_show_venue_period', 'venue_id'),
+                         ('ex_show_artist_period', 'artist_id')):
+        op.execute(f'ALTER TABLE "Show" ADD CONSTRAINT {name} '
+                   f'EXCLUDE USING gist ({column} WITH =, {PERIOD} WITH &&)')
+
+
+def downgrade():
+    for name in ('ex_show_artist_period', 'ex_show_venue_period'):
+        op.drop_constraint(name, 'Show')
+    op.drop_column('Show', 'duration')
@@ -0,0 +1,29 @@
+"""keyset pagination indexes for the listings
+
+Revision ID: 8d4e6b2f0a31
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 11:40:52.103774
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e6b2f0a31'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_venue_city_state_name_id', 'Venue',
+                    ['city', 'state', 'name', 'id'])
+    op.create_index('ix_artist_name_id', 'Artist', ['name', 'id'])
+    op.create_index('ix_show_start_time_id', 'Show', ['start_time', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_show_start_time_id', table_name='Show')
+    op.drop_index('ix_artist_name_id', table_name='Artist')
+    op.drop_index('ix_venue_city_state_name_id', table_name='Venue')
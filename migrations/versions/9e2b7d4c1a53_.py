@@ -0,0 +1,84 @@
+"""recreate Venue, Artist and Show as models.py defines them
+
+Revision ID: 9e2b7d4c1a53
+Revises: 0eb351a0c58a
+Create Date: 2026-10-19 09:12:40.571928
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2b7d4c1a53'
+down_revision = '0eb351a0c58a'
+branch_labels = None
+depends_on = None
+
+# 0eb351a0c58a dropped all three tables and nothing recreated them, so
+# every later revision failed on a fresh database. These are the tables
+# of the models at that point; the revisions after this one add to them.
+
+STATES = (
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID',
+    'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM',
+    'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'PA',
+    'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY')
+
+GENRES = (
+    'Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk', 'Funk',
+    'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre', 'Pop',
+    'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul', 'Other')
+
+
+def upgrade():
+    op.create_table(
+        'Venue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('city', sa.String(length=120), nullable=False),
+        sa.Column('state', sa.Enum(*STATES, name='state'), nullable=False),
+        sa.Column('address', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=120), nullable=False),
+        sa.Column('image_link', sa.String(length=500), nullable=False),
+        sa.Column('genres', postgresql.ARRAY(sa.Enum(*GENRES, name='genre')), nullable=False),
+        sa.Column('facebook_link', sa.String(length=120), nullable=False),
+        sa.Column('website_link', sa.String(length=120), nullable=False),
+        sa.Column('seeking_talent', sa.Boolean(), nullable=False),
+        sa.Column('seeking_decription', sa.String(length=500), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'Artist',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('city', sa.String(length=120), nullable=False),
+        sa.Column('state', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=120), nullable=False),
+        sa.Column('image_link', sa.String(length=500), nullable=False),
+        sa.Column('facebook_link', sa.String(length=120), nullable=False),
+        sa.Column('website_link', sa.String(length=120), nullable=False),
+        sa.Column('seeking_venue', sa.Boolean(), nullable=False),
+        sa.Column('seeking_description', sa.String(length=500), nullable=False),
+        sa.Column('genres', postgresql.ARRAY(sa.String()), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'Show',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('artist_id', sa.Integer(), nullable=False),
+        sa.Column('venue_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['artist_id'], ['Artist.id']),
+        sa.ForeignKeyConstraint(['venue_id'], ['Venue.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('Show')
+    op.drop_table('Artist')
+    op.drop_table('Venue')
+    sa.Enum(name='genre').drop(op.get_bind())
+    sa.Enum(name='state').drop(op.get_bind())
@@ -0,0 +1,50 @@
+"""VenueStats and ArtistStats show statistics
+
+Revision ID: b01237dd5c2d
+Revises: 5a9f03c1e7b2
+Create Date: 2026-10-18 19:52:13.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b01237dd5c2d'
+down_revision = '5a9f03c1e7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table, key, parent in (('VenueStats', 'venue_id', 'Venue'),
+                               ('ArtistStats', 'artist_id', 'Artist')):
+        op.create_table(
+            table,
+            sa.Column(key, sa.Integer(), nullable=False),
+            sa.Column('upcoming_count', sa.Integer(), nullable=False),
+            sa.Column('past_count', sa.Integer(), nullable=False),
+            sa.Column('next_show_at', sa.DateTime(), nullable=True),
+            sa.Column('last_show_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint([key], [f'{parent}.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint(key)
+        )
+        op.create_index(op.f(f'ix_{table}_next_show_at'), table, ['next_show_at'])
+        # backfill; `flask refresh-stats` keeps it rolling from here
+        op.execute(f'''
+            INSERT INTO "{table}" ({key}, upcoming_count, past_count,
+                                   next_show_at, last_show_at)
+            SELECT {key},
+                   count(*) FILTER (WHERE start_time > localtimestamp),
+                   count(*) FILTER (WHERE start_time <= localtimestamp),
+                   min(start_time) FILTER (WHERE start_time > localtimestamp),
+                   max(start_time) FILTER (WHERE start_time <= localtimestamp)
+            FROM "Show"
+            GROUP BY {key}
+        ''')
+
+
+def downgrade():
+    for table in ('ArtistStats', 'VenueStats'):
+        op.drop_index(op.f(f'ix_{table}_next_show_at'), table_name=table)
+        op.drop_table(table)
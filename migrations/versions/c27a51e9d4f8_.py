@@ -0,0 +1,31 @@
+"""Show foreign key / start_time indexes
+
+Revision ID: c27a51e9d4f8
+Revises: 8d4e6b2f0a31
+Create Date: 2026-10-18 12:15:07.552310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27a51e9d4f8'
+down_revision = '8d4e6b2f0a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (start_time) and Venue (city, state) are already served by the
+    # leading columns of ix_show_start_time_id and
+    # ix_venue_city_state_name_id, so no separate indexes for those
+    op.create_index('ix_show_venue_id_start_time', 'Show',
+                    ['venue_id', 'start_time'])
+    op.create_index('ix_show_artist_id_start_time', 'Show',
+                    ['artist_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_show_artist_id_start_time', table_name='Show')
+    op.drop_index('ix_show_venue_id_start_time', table_name='Show')
@@ -0,0 +1,27 @@
+"""Venue and Artist version columns for optimistic locking
+
+Revision ID: e4a7c91b3f26
+Revises: b01237dd5c2d
+Create Date: 2026-10-18 21:05:41.581930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c91b3f26'
+down_revision = 'b01237dd5c2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False,
+                                       server_default='1'))
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'version')
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+# the SQLite stand-in unless DATABASE_URL names a scratch Postgres database;
+# its tables are dropped and recreated
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(
+    tempfile.gettempdir(), 'fyyur-tests.db'))
+
+import pytest
+from appFolder import app as fyyur, db
+from appFolder import controller, api  # noqa: F401 (registers the routes)
+from benchmarks import datagen
+
+TEST_SHOWS = 2000
+
+
+@pytest.fixture(scope='session')
+def app():
+    # rendered pages are not cached, so every request runs its queries
+    fyyur.config.update(TESTING=True, RESPONSE_CACHE_ENABLED=False,
+                        SLOW_REQUEST_MS=10 ** 9, SLOW_REQUEST_QUERIES=10 ** 9)
+    with fyyur.app_context():
+        datagen.generate(TEST_SHOWS)
+        yield fyyur
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
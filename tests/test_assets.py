@@ -0,0 +1,36 @@
+import os
+import shutil
+import pytest
+from appFolder import assets
+
+
+@pytest.fixture
+def static(app, tmp_path, monkeypatch):
+    # a copy of static/ to build into
+    folder = tmp_path / 'static'
+    shutil.copytree(app.static_folder, folder, ignore=shutil.ignore_patterns(assets.BUILD_DIR))
+    monkeypatch.setattr(app, 'static_folder', str(folder))
+    return folder
+
+
+def _rebuild(static):
+    with open(static / 'css' / 'main.css', 'a') as f:
+        f.write('\n.rebuilt{color:red}')
+    return {bundle: built['path'] for bundle, built in assets.build().items()}
+
+
+def _exists(static, paths):
+    return [os.path.exists(static / path) for path in paths.values()]
+
+
+def test_build_keeps_previous_generation(static):
+    first = _rebuild(static)
+    second = _rebuild(static)
+    assert first['main.css'] != second['main.css']
+    assert all(_exists(static, first)) and all(_exists(static, second))
+
+    third = _rebuild(static)
+    assert not os.path.exists(static / (first['main.css'] + '.gz'))
+    assert _exists(static, first) == [False, True, True]  # the JS did not change
+    assert all(_exists(static, second)) and all(_exists(static, third))
+    assert assets._load_manifest(static / assets.BUILD_DIR / 'manifest.json') == third
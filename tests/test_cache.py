@@ -0,0 +1,45 @@
+import os
+import time
+from appFolder import cache, controller, db
+from appFolder.model import Venue
+
+
+def _files(directory):
+    return [name for _, _, files in os.walk(directory) for name in files]
+
+
+def test_file_backend_removes_expired_files(tmp_path):
+    backend = cache.FileBackend(str(tmp_path))
+    backend.set('gone', 'page', -1)
+    backend.set('kept', 'page', 60)
+    assert backend.get('gone') is None
+    assert backend.get('kept') == 'page'
+    assert len(_files(tmp_path)) == 1
+
+
+def test_file_backend_sweeps_keys_nobody_reads(tmp_path, monkeypatch):
+    backend = cache.FileBackend(str(tmp_path))
+    for i in range(300):
+        backend.set(f'old:{i}', 'page', 1)
+    monkeypatch.setattr(time, 'time', lambda now=time.time(): now + 10)
+    assert sum(backend.sweep(f'{i:02x}') for i in range(256)) == 300
+    assert _files(tmp_path) == []
+
+
+def test_delete_venue_invalidates_after_commit(client, monkeypatch):
+    venue = Venue(**{column: getattr(db.session.get(Venue, 1), column)
+                     for column in ('city', 'state', 'address', 'phone', 'image_link', 'genres',
+                                    'facebook_link', 'website_link', 'seeking_talent',
+                                    'seeking_decription')}, name='Short Lived Hall')
+    db.session.add(venue)
+    db.session.commit()
+    venue_id = venue.id
+    seen = []
+
+    def invalidate(*tags):
+        # what a request filling the new tag versions would read
+        seen.append(db.session.query(Venue.id).filter_by(id=venue_id).count())
+    monkeypatch.setattr(cache, 'invalidate', invalidate)
+    assert client.delete(f'/venues/{venue_id}').status_code == 200
+    assert seen == [0]
+    assert controller.venue_tags(venue_id)[:3] == [f'venue:{venue_id}', 'venues', 'shows']
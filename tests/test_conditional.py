@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from appFolder import db
+from appFolder.model import Show
+
+
+def _free_slot(venue_id, artist_id):
+    # an hour after the last show of either, so the booking never clashes
+    last = db.session.query(db.func.max(Show.start_time)).filter(
+        (Show.venue_id == venue_id) | (Show.artist_id == artist_id)).scalar()
+    return (last or datetime.now()) + timedelta(days=1)
+
+
+def test_revalidates_unchanged_page(client):
+    etag = client.get('/venues').headers['ETag']
+    assert client.get('/venues', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_new_show_changes_venues_etag(client):
+    # the listing rows carry upcoming counts, which live in VenueStats
+    before = client.get('/venues')
+    start = _free_slot(1, 1)
+    response = client.post('/shows/create', data={
+        'venue_id': 1, 'artist_id': 1, 'start_time': f'{start:%Y-%m-%d %H:%M:%S}'})
+    assert response.status_code == 200
+    assert db.session.query(Show).filter_by(venue_id=1, start_time=start).count() == 1
+
+    after = client.get('/venues', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
@@ -0,0 +1,76 @@
+import io
+import json
+import random
+from datetime import datetime
+import pytest
+from appFolder import db, exporter, importer
+from appFolder.model import Venue, Show
+from benchmarks import datagen
+
+VENUE_FIELDS = ['name', 'city', 'state', 'address', 'phone', 'image_link', 'genres',
+                'facebook_link', 'website_link', 'seeking_talent', 'seeking_decription']
+SHOW_FIELDS = ['venue_id', 'artist_id', 'start_time', 'duration']
+
+
+def _exported(table, fmt, id):
+    # the line(s) `flask export` writes for one row: CSV keeps its header
+    out = io.StringIO()
+    exporter.export_table(table, out, fmt)
+    lines = out.getvalue().splitlines(keepends=True)
+    if fmt == 'csv':
+        return [lines[0]] + [line for line in lines[1:] if line.split(',')[0] == str(id)]
+    return [line for line in lines if json.loads(line)['id'] == id]
+
+
+def _round_trip(tmp_path, table, fmt, obj):
+    # export obj, delete it, import it again; returns the import counts
+    lines = _exported(table, fmt, obj.id)
+    path = tmp_path / f'{table}.{fmt}'
+    path.write_text(''.join(lines))
+    db.session.delete(obj)
+    db.session.commit()
+    errors = []
+    counts = importer.import_file(table, str(path), on_error=lambda *e: errors.append(e))
+    assert errors == []
+    return counts
+
+
+@pytest.fixture
+def venue(app):
+    row = next(datagen.venue_rows(random.Random(0), 1))
+    venue = Venue(**dict(row, name='Round Trip Hall', genres=['Jazz', 'Folk'],
+                         seeking_talent=True, seeking_decription='Looking for a trio'))
+    db.session.add(venue)
+    db.session.commit()
+    yield venue
+    db.session.rollback()
+    db.session.query(Venue).filter_by(name='Round Trip Hall').delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def show(app):
+    show = Show(venue_id=2, artist_id=2, start_time=datetime(2096, 3, 4, 20, 30, 15, 250000),
+                duration=90)
+    db.session.add(show)
+    db.session.commit()
+    yield show
+    db.session.rollback()
+    db.session.query(Show).filter(Show.start_time >= datetime(2096, 1, 1)).delete()
+    db.session.commit()
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_venue_round_trip(tmp_path, venue, fmt):
+    before = {field: getattr(venue, field) for field in VENUE_FIELDS}
+    assert _round_trip(tmp_path, 'venues', fmt, venue)['inserted'] == 1
+    after = db.session.query(Venue).filter_by(name='Round Trip Hall').one()
+    assert {field: getattr(after, field) for field in VENUE_FIELDS} == before
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_show_round_trip(tmp_path, show, fmt):
+    before = {field: getattr(show, field) for field in SHOW_FIELDS}
+    assert _round_trip(tmp_path, 'shows', fmt, show)['inserted'] == 1
+    after = db.session.query(Show).filter(Show.start_time >= datetime(2096, 1, 1)).one()
+    assert {field: getattr(after, field) for field in SHOW_FIELDS} == before
@@ -0,0 +1,53 @@
+import json
+import random
+import pytest
+from sqlalchemy.exc import OperationalError
+from appFolder import db, importer
+from appFolder.model import Venue
+from benchmarks import datagen
+
+
+def _venue(name):
+    return dict(next(datagen.venue_rows(random.Random(0), 1)), name=name)
+
+
+def _import(tmp_path, lines, **kwargs):
+    path = tmp_path / 'venues.ndjson'
+    path.write_text('\n'.join(lines) + '\n')
+    errors = []
+    counts = importer.import_file('venues', str(path),
+                                  on_error=lambda line, problems: errors.append((line, problems)),
+                                  **kwargs)
+    return counts, errors
+
+
+@pytest.fixture
+def cleanup(app):
+    yield
+    db.session.rollback()
+    db.session.query(Venue).filter(Venue.name.like('Import Test %')).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def test_unreadable_lines_are_reported(tmp_path, cleanup):
+    counts, errors = _import(tmp_path, [
+        json.dumps(_venue('Import Test 1')),
+        '{bad json',
+        '["a"]',
+        json.dumps(_venue('Import Test 2')),
+    ], chunk_size=2)
+    assert counts == {"inserted": 2, "skipped": 0, "failed": 2}
+    assert [line for line, _ in errors] == [2, 3]
+    assert errors[0][1]['line'][0].startswith('Not valid JSON')
+    assert errors[1][1] == {"line": ['Not a JSON object.']}
+
+
+def test_refused_chunk_is_rolled_back_and_reported(tmp_path, cleanup, monkeypatch):
+    def refuse(records):
+        raise OperationalError('INSERT', {}, Exception('server closed the connection'))
+    monkeypatch.setitem(importer.TABLES, 'venues', dict(importer.TABLES['venues'], inserted=refuse))
+    counts, errors = _import(tmp_path, [json.dumps(_venue(f'Import Test {i}')) for i in range(3)])
+    assert counts["inserted"] == 0 and counts["failed"] == 3
+    assert [line for line, _ in errors] == [1, 2, 3]
+    assert errors[0][1] == {"database": ['server closed the connection']}
+    assert db.session.query(Venue).filter(Venue.name.like('Import Test %')).count() == 0
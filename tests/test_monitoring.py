@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine
+from appFolder import monitoring
+from appFolder.pool import InstrumentedQueuePool
+
+
+def _checkouts(lines, url):
+    return int(next(line for line in lines if line.startswith(
+        f'fyyur_db_pool_checkout_seconds_count{{engine="{url}"}}')).split()[-1])
+
+
+def test_pool_metrics_per_engine(tmp_path, monkeypatch):
+    primary, replica = (create_engine(f'sqlite:///{tmp_path}/{name}.db',
+                                      poolclass=InstrumentedQueuePool)
+                        for name in ('primary', 'replica'))
+    monkeypatch.setattr(monitoring, '_engines', lambda: [('primary', primary), ('replica-1', replica)])
+    for _ in range(3):
+        primary.connect().close()
+    replica.connect().close()
+    # a disposed engine's new pool keeps counting
+    primary.dispose()
+    primary.connect().close()
+
+    lines = monitoring.pool_metrics()
+    assert _checkouts(lines, 'primary') == 4
+    assert _checkouts(lines, 'replica-1') == 1
+    assert sum(line.startswith('# TYPE fyyur_db_pool_size ') for line in lines) == 1
+    assert not any(str(tmp_path) in line for line in lines)
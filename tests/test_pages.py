@@ -0,0 +1,60 @@
+from html.parser import HTMLParser
+from werkzeug.datastructures import MultiDict
+from appFolder import db
+from appFolder.model import Venue
+
+
+class FormValues(HTMLParser):
+    # what a browser would submit for the form on a page, unchanged
+    def __init__(self):
+        super().__init__()
+        self.values = MultiDict()
+        self.select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'input' and attrs.get('type') != 'submit':
+            if attrs.get('type') != 'checkbox' or 'checked' in attrs:
+                self.values.add(attrs['name'], attrs.get('value', 'y'))
+        elif tag in ('select', 'textarea'):
+            self.select = attrs['name']
+            if tag == 'textarea':
+                self.values.add(self.select, '')
+        elif tag == 'option' and 'selected' in attrs:
+            self.values.add(self.select, attrs['value'])
+
+    def handle_data(self, data):
+        if self.select and self.lasttag == 'textarea':
+            self.values.setlist(self.select, [data])
+
+
+def _form_values(html):
+    parser = FormValues()
+    parser.feed(html)
+    return parser.values
+
+
+def test_pages_show_states_and_genres_by_value(client):
+    venue = db.session.get(Venue, 1)
+    listing = client.get('/venues').get_data(as_text=True)
+    detail = client.get('/venues/1').get_data(as_text=True)
+    assert f'{venue.city}, {venue.state.value}' in listing
+    assert f'{venue.city}, {venue.state.value}' in detail
+    assert all(genre.value in detail for genre in venue.genres)
+    for body in (listing, detail):
+        assert 'State.' not in body and 'Genre.' not in body
+
+
+def test_edit_venue_form_saves_unchanged(client):
+    venue = db.session.get(Venue, 2)
+    state, genres = venue.state, list(venue.genres)
+    values = _form_values(client.get('/venues/2/edit').get_data(as_text=True))
+    assert values['state'] == state.name
+    assert values.getlist('genres') == [genre.name for genre in genres]
+
+    response = client.post('/venues/2/edit', data=values, follow_redirects=True)
+    assert response.request.path == '/venues/2'
+    assert 'No changes to save' in response.get_data(as_text=True)
+    db.session.expire_all()
+    venue = db.session.get(Venue, 2)
+    assert (venue.state, venue.genres) == (state, genres)
@@ -0,0 +1,60 @@
+import pytest
+from appFolder import queries
+from appFolder.pagination import keyset_page
+
+# Walking a listing page by page, by its cursors, must visit every row
+# exactly once and in the listing's order, in both directions.
+
+LISTINGS = {
+    'venues': (queries.venue_rows, queries.VENUE_ORDER),
+    'artists': (queries.artist_rows, queries.ARTIST_ORDER),
+    'shows': (queries.show_rows, queries.SHOW_ORDER),
+}
+
+
+def _ids(rows):
+    return [row.id for row in rows]
+
+
+@pytest.fixture(params=sorted(LISTINGS))
+def listing(app, request):
+    rows, order = LISTINGS[request.param]
+    return rows, order, _ids(rows().order_by(*order).all())
+
+
+def test_forward(listing):
+    rows, order, expected = listing
+    seen, cursor = [], None
+    while True:
+        page = keyset_page(rows(), order, after=cursor, limit=7)
+        seen += _ids(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert page["items"]
+    assert seen == expected
+
+
+def test_backward(listing):
+    rows, order, expected = listing
+    page = keyset_page(rows(), order, limit=7)
+    while page["next_cursor"]:
+        page = keyset_page(rows(), order, after=page["next_cursor"], limit=7)
+    seen = _ids(page["items"])
+    while page["prev_cursor"]:
+        page = keyset_page(rows(), order, before=page["prev_cursor"], limit=7)
+        seen = _ids(page["items"]) + seen
+    assert seen == expected
+
+
+def test_first_page_has_no_prev(listing):
+    rows, order, expected = listing
+    page = keyset_page(rows(), order, limit=7)
+    assert page["prev_cursor"] is None
+    assert _ids(page["items"]) == expected[:7]
+
+
+def test_bad_cursor_is_first_page(listing):
+    rows, order, expected = listing
+    for cursor in ('not-a-cursor', 'WzFd', ''):
+        assert _ids(keyset_page(rows(), order, after=cursor, limit=7)["items"]) == expected[:7]
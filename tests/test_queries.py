@@ -0,0 +1,90 @@
+import pytest
+from appFolder import cache, db, queries
+from appFolder.model import Venue, Artist
+from appFolder.monitoring import max_queries
+from appFolder.pagination import keyset_page
+
+# Statement budgets of the read routes. Each is a fixed number of round
+# trips, however many rows a page or an entity has: the version query
+# behind ETag/Last-Modified (HTML pages only), then the page's own
+# statements (see appFolder/queries.py). A route going over its budget
+# fails with the statements it ran.
+
+
+@pytest.fixture(autouse=True)
+def cold_cache(app):
+    # a memoized timeline would hide the detail page's third statement
+    cache.backend.clear()
+
+
+@pytest.fixture(scope='module')
+def ids(app):
+    # venue and artist 1 have the most shows (see benchmarks/datagen.py),
+    # the last ids a few
+    return {
+        "venue": 1,
+        "artist": 1,
+        "tail_venue": db.session.query(db.func.max(Venue.id)).scalar(),
+        "tail_artist": db.session.query(db.func.max(Artist.id)).scalar()
+    }
+
+
+@pytest.mark.parametrize('url, limit', [
+    ('/venues', 2),
+    ('/venues?limit=200', 2),
+    ('/artists', 2),
+    ('/artists?limit=200', 2),
+    ('/shows', 2),
+    ('/shows?limit=200', 2),
+    ('/api/v1/venues', 1),
+    ('/api/v1/artists', 1),
+    ('/api/v1/shows', 1),
+])
+def test_listing(client, url, limit):
+    with max_queries(limit):
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.parametrize('rows, order, url', [
+    (queries.venue_rows, queries.VENUE_ORDER, '/venues'),
+    (queries.artist_rows, queries.ARTIST_ORDER, '/artists'),
+    (queries.show_rows, queries.SHOW_ORDER, '/shows'),
+])
+def test_listing_next_page(client, rows, order, url):
+    cursor = keyset_page(rows(), order, limit=10)["next_cursor"]
+    assert cursor
+    with max_queries(2):
+        assert client.get(f'{url}?limit=10&after={cursor}').status_code == 200
+
+
+@pytest.mark.parametrize('path, key, limit', [
+    ('/venues/{}', 'venue', 3),
+    ('/venues/{}', 'tail_venue', 3),
+    ('/artists/{}', 'artist', 3),
+    ('/artists/{}', 'tail_artist', 3),
+    ('/api/v1/venues/{}', 'venue', 2),
+    ('/api/v1/venues/{}', 'tail_venue', 2),
+    ('/api/v1/artists/{}', 'artist', 2),
+    ('/api/v1/artists/{}', 'tail_artist', 2),
+])
+def test_detail(client, ids, path, key, limit):
+    with max_queries(limit):
+        assert client.get(path.format(ids[key])).status_code == 200
+
+
+@pytest.mark.parametrize('url, term', [
+    ('/venues/search', 'hop'),
+    ('/venues/search', ''),
+    ('/artists/search', 'band'),
+    ('/artists/search', ''),
+])
+def test_search(client, url, term):
+    # the hits, their total and their upcoming counts
+    with max_queries(3):
+        assert client.post(url, data={'search_term': term}).status_code == 200
+
+
+@pytest.mark.parametrize('url', ['/api/v1/venues/search?q=hop', '/api/v1/artists/search?q=band'])
+def test_api_search(client, url):
+    with max_queries(3):
+        assert client.get(url).status_code == 200
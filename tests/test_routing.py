@@ -0,0 +1,44 @@
+import time
+import pytest
+from sqlalchemy import create_engine, event
+from appFolder import cache, db
+
+
+class FakeReplicas:
+    # a "replica" on the test database that records the statements it runs
+    def __init__(self, uri):
+        self.engine = create_engine(uri)
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+    def pick(self):
+        return self.engine
+
+
+@pytest.fixture
+def replica(app, monkeypatch):
+    replicas = FakeReplicas(app.config['SQLALCHEMY_DATABASE_URI'])
+    monkeypatch.setattr(db, 'replicas', lambda: replicas)
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_ENABLED', True)
+    cache.backend.clear()
+    # a fresh g: requests share the session's app context, and with it the
+    # db_wrote flag of earlier tests' writes
+    with app.app_context():
+        yield replicas
+    cache.backend.clear()
+    replicas.engine.dispose()
+
+
+def test_page_fills_from_replica(client, replica):
+    cache.backend.set('tag:venues', time.time_ns() - 60 * 10**9, cache.TAG_TTL)
+    assert client.get('/venues').status_code == 200
+    # the version query and the page
+    assert len(replica.statements) == 2
+
+
+def test_page_fill_after_invalidation_reads_primary(client, replica):
+    cache.invalidate('venues')
+    assert client.get('/venues').status_code == 200
+    # only the version query, which runs before the page cache
+    assert len(replica.statements) == 1
@@ -0,0 +1,99 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from appFolder import db, scheduling
+from appFolder.model import Show
+
+START = datetime(2030, 1, 1, 18)
+
+
+def _shows(rng, count):
+    return [{
+        "venue_id": rng.randint(1, 5),
+        "artist_id": rng.randint(1, 8),
+        "start_time": START + timedelta(minutes=15 * rng.randint(0, 200)),
+        "duration": rng.choice([30, 60, 120, 240])
+    } for _ in range(count)]
+
+
+def _brute_force(shows):
+    # the positions the sweep should reject: taking shows by start time
+    # (then position), one is rejected when it overlaps any show kept
+    # before it that has its venue or artist
+    kept, rejected = [], set()
+    for position in sorted(range(len(shows)), key=lambda i: (shows[i]['start_time'], i)):
+        show = shows[position]
+        end = scheduling.end_time(show['start_time'], show['duration'])
+        if any((other['venue_id'] == show['venue_id'] or other['artist_id'] == show['artist_id'])
+               and other['start_time'] < end
+               and show['start_time'] < scheduling.end_time(other['start_time'], other['duration'])
+               for other in kept):
+            rejected.add(position)
+        else:
+            kept.append(show)
+    return rejected
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_sweep_matches_brute_force(seed):
+    shows = _shows(random.Random(seed), 60)
+    assert set(scheduling.overlapping(shows)) == _brute_force(shows)
+
+
+def _overlap(a, b):
+    return (a['venue_id'] == b['venue_id'] or a['artist_id'] == b['artist_id']) \
+        and a['start_time'] < scheduling.end_time(b['start_time'], b['duration']) \
+        and b['start_time'] < scheduling.end_time(a['start_time'], a['duration'])
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_conflicts_match_brute_force(seed, monkeypatch):
+    # stored shows are fixed: every batch show overlapping one is rejected,
+    # the rest are checked among themselves
+    rng = random.Random(seed)
+    stored, shows = _shows(rng, 20), _shows(rng, 60)
+    monkeypatch.setattr(scheduling, '_booked', lambda *args: [
+        scheduling.Booking(s['start_time'], scheduling.end_time(s['start_time'], s['duration']),
+                           s['venue_id'], s['artist_id'], id, None)
+        for id, s in enumerate(stored, start=1)])
+    blocked = {i for i, show in enumerate(shows) if any(_overlap(show, s) for s in stored)}
+    rest = [i for i in range(len(shows)) if i not in blocked]
+    expected = blocked | {rest[i] for i in _brute_force([shows[i] for i in rest])}
+    assert set(scheduling.conflicts(shows)) == expected
+
+
+def test_back_to_back_is_fine():
+    first = {"venue_id": 1, "artist_id": 1, "start_time": START, "duration": 60}
+    second = dict(first, start_time=START + timedelta(minutes=60))
+    assert scheduling.overlapping([first, second]) == {}
+    assert set(scheduling.overlapping([first, dict(second, duration=1, start_time=START)])) == {1}
+
+
+def test_reports_the_clashing_field():
+    first = {"venue_id": 1, "artist_id": 1, "start_time": START, "duration": 60}
+    found = scheduling.overlapping([first, dict(first, venue_id=2)])
+    field, booking = found[1]
+    assert field == 'artist_id' and booking.position == 0
+
+
+def test_conflicts_with_stored_shows(app):
+    show = db.session.query(Show).order_by(Show.start_time.desc()).first()
+    clash = {"venue_id": show.venue_id, "artist_id": -1,
+             "start_time": show.start_time + timedelta(minutes=show.duration - 1), "duration": 30}
+    after = dict(clash, start_time=scheduling.end_time(show.start_time, show.duration))
+    # starts an hour earlier and runs into the stored show
+    before = dict(clash, start_time=show.start_time - timedelta(hours=1), duration=240)
+    found = scheduling.conflicts([clash, after, before])
+    assert sorted(found) == [0, 2]
+    for position in (0, 2):
+        assert found[position][0] == 'venue_id' and found[position][1].show_id == show.id
+
+
+def test_stored_shows_are_fixed(app):
+    # a batch show rejected for a stored one does not block the batch
+    # show after it
+    show = db.session.query(Show).order_by(Show.start_time.desc()).first()
+    early = {"venue_id": show.venue_id, "artist_id": -1,
+             "start_time": show.start_time - timedelta(hours=1), "duration": 120}
+    later = dict(early, start_time=early['start_time'] + timedelta(minutes=30), duration=20)
+    assert list(scheduling.conflicts([early, later])) == [0]
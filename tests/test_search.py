@@ -0,0 +1,43 @@
+import random
+import pytest
+from appFolder import db, search
+from appFolder.model import Venue, Artist
+from benchmarks import datagen
+
+NAMES = ['100% Jazz', '100 Jazz', 'A_B', 'AxB', 'Back\\slash']
+
+
+@pytest.fixture
+def venues(app):
+    rng = random.Random(0)
+    for name in NAMES:
+        db.session.add(Venue(**dict(next(datagen.venue_rows(rng, 1)), name=name, city='Qq')))
+    db.session.flush()
+    yield
+    db.session.rollback()
+
+
+@pytest.mark.parametrize('term, expected', [
+    ('%', ['100% Jazz']),
+    ('100%', ['100% Jazz']),
+    ('_', ['A_B']),
+    ('a_b', ['A_B']),
+    ('\\', ['Back\\slash']),
+    ('100', ['100 Jazz', '100% Jazz']),
+])
+def test_terms_match_literally(venues, term, expected):
+    assert sorted(row.name for row in search.search(Venue, term).items) == expected
+
+
+def test_exact_name_ranks_first(venues):
+    assert search.search(Venue, '100 jazz').items[0].name == '100 Jazz'
+
+
+@pytest.mark.parametrize('model', [Venue, Artist])
+def test_state_matches_whole_term(app, model):
+    rows = search.search(model, 'ny', per_page=500).items
+    assert rows
+    states = {str(getattr(state, 'name', state)) for state, in db.session.query(model.state)
+              .filter(model.id.in_([row.id for row in rows]))}
+    assert 'NY' in states
+    assert search.search(model, 'nyx').items == []
@@ -0,0 +1,76 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from appFolder import app as fyyur, db, stats
+from appFolder.model import Show, VenueStats, ArtistStats
+
+FAR = datetime(2095, 1, 1, 20)
+
+
+def _recount(model_key, entity_id):
+    return db.session.query(db.func.count(Show.id)).filter(
+        model_key == entity_id, Show.start_time > datetime.now()).scalar()
+
+
+def _upcoming(stats_model, key, entity_id):
+    db.session.expire_all()
+    return db.session.query(stats_model.upcoming_count).filter(key == entity_id).scalar() or 0
+
+
+@pytest.fixture
+def cleanup(app):
+    yield
+    db.session.rollback()
+    db.session.query(Show).filter(Show.start_time >= FAR).delete()
+    db.session.commit()
+    stats.rebuild()
+
+
+def test_follows_orm_writes(cleanup):
+    show = Show(venue_id=2, artist_id=3, start_time=FAR, duration=60)
+    db.session.add(show)
+    db.session.commit()
+    assert _upcoming(VenueStats, VenueStats.venue_id, 2) == _recount(Show.venue_id, 2)
+
+    show.venue_id = 3
+    db.session.commit()
+    for venue_id in (2, 3):
+        assert _upcoming(VenueStats, VenueStats.venue_id, venue_id) == _recount(Show.venue_id, venue_id)
+
+    db.session.delete(show)
+    db.session.commit()
+    assert _upcoming(ArtistStats, ArtistStats.artist_id, 3) == _recount(Show.artist_id, 3)
+
+
+@pytest.mark.skipif(not fyyur.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'),
+                    reason='concurrent writers need Postgres')
+def test_concurrent_refreshes_of_one_venue(cleanup):
+    # both transactions flush a show of venue 1 (which refreshes its stats
+    # row) before the first one commits
+    barrier, errors = threading.Barrier(2), []
+
+    def add_show(artist_id, start_time):
+        with fyyur.app_context():
+            try:
+                barrier.wait()
+                db.session.add(Show(venue_id=1, artist_id=artist_id, start_time=start_time,
+                                    duration=60))
+                db.session.flush()
+                time.sleep(0.2)
+                db.session.commit()
+            except Exception as error:
+                errors.append(error)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=add_show, args=(10 + i, FAR + timedelta(days=i)))
+               for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert _upcoming(VenueStats, VenueStats.venue_id, 1) == _recount(Show.venue_id, 1)
@@ -0,0 +1,72 @@
+import random
+import pytest
+from appFolder import db, writes
+from appFolder.model import Venue
+from benchmarks import datagen
+
+
+@pytest.fixture
+def venue(app):
+    # a fresh venue at version 1
+    row = dict(next(datagen.venue_rows(random.Random(), 1)), name='Edited Hall')
+    with writes.unit_of_work() as session:
+        venue_id = session.execute(Venue.__table__.insert(), row).inserted_primary_key[0]
+    yield venue_id
+    with writes.unit_of_work() as session:
+        session.execute(Venue.__table__.delete().where(Venue.id == venue_id))
+
+
+def _version(venue_id):
+    return db.session.query(Venue.version).filter(Venue.id == venue_id).scalar()
+
+
+def _form(venue_id, **changes):
+    # the edit form as submitted for the venue's current row
+    venue = db.session.get(Venue, venue_id)
+    data = {
+        "name": venue.name, "city": venue.city, "state": venue.state.name,
+        "address": venue.address, "phone": venue.phone, "image_link": venue.image_link,
+        "genres": [genre.name for genre in venue.genres],
+        "facebook_link": venue.facebook_link, "website_link": venue.website_link,
+        "seeking_description": venue.seeking_decription, "version": venue.version
+    }
+    db.session.close()
+    return dict(data, **changes)
+
+
+def test_update_bumps_version(venue):
+    with writes.unit_of_work():
+        assert writes.update(Venue, venue, {"name": 'Renamed Hall'}, version=1) == 2
+    assert _version(venue) == 2
+
+
+def test_unchanged_update_writes_nothing(venue):
+    with writes.unit_of_work():
+        assert writes.update(Venue, venue, {"name": 'Edited Hall'}, version=1) is None
+    assert _version(venue) == 1
+
+
+def test_stale_version_conflicts(venue):
+    with writes.unit_of_work():
+        writes.update(Venue, venue, {"name": 'First Save'}, version=1)
+    with pytest.raises(writes.Conflict):
+        with writes.unit_of_work():
+            writes.update(Venue, venue, {"name": 'Second Save'}, version=1)
+    assert db.session.get(Venue, venue).name == 'First Save'
+
+
+def test_missing_row(app):
+    with pytest.raises(writes.NotFound):
+        with writes.unit_of_work():
+            writes.update(Venue, 10 ** 9, {"name": 'Nowhere'}, version=1)
+
+
+def test_edit_form_refuses_a_stale_save(client, venue):
+    first, second = _form(venue, name='Mine'), _form(venue, name='Theirs')
+    assert client.post(f'/venues/{venue}/edit', data=first).location.endswith(f'/venues/{venue}')
+    response = client.post(f'/venues/{venue}/edit', data=second)
+    assert response.location.endswith(f'/venues/{venue}/edit')
+    with client.session_transaction() as session:
+        assert 'changed by someone else' in session['_flashes'][-1][1]
+    assert db.session.get(Venue, venue).name == 'Mine'
+    assert _version(venue) == 2